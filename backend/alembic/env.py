@@ -8,6 +8,7 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.orm import configure_mappers
 
 from alembic import context
 
@@ -19,10 +20,7 @@ from app.core.config import settings
 from app.core.database import Base
 
 # Import all models to register them with Base.metadata
-from app.models.user import User
-from app.models.grant import Grant
-from app.models.application import Application
-from app.models.document import Document
+from app.models import *  # noqa: F401,F403
 
 # this is the Alembic Config object
 config = context.config
@@ -31,13 +29,26 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Resolve relationships once, now that every model is registered
+configure_mappers()
+
 # Set target metadata for autogenerate
 target_metadata = Base.metadata
 
+# Tables kept by migrations for downgrades; they have no model, and
+# autogenerate must not propose dropping them
+UNMANAGED_TABLES = {"legacy_0003a_values"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave UNMANAGED_TABLES out of autogenerate comparisons."""
+    return not (type_ == "table" and name in UNMANAGED_TABLES)
+
+
 # Override sqlalchemy.url from settings
 def get_url():
-    """Get database URL from settings."""
-    return f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+    """Get database URL from settings, using the sync psycopg2 driver."""
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
 
 
 def run_migrations_offline() -> None:
@@ -49,12 +60,15 @@ def run_migrations_offline() -> None:
     we don't even need a DBAPI to be available.
 
     Calls to context.execute() here emit the given string to the
-    script output.
+    script output. Use scripts/emit_migration_sql.sh to render the
+    script; migrations must go through op.execute() rather than
+    op.get_bind() so their output stays pure SQL.
     """
     url = get_url()
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -72,16 +86,25 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     
+    # A one-shot migration run keeps reusing the same connection, so a real
+    # pool avoids reconnecting between statements. NullPool is only needed
+    # when migrations are driven from forked worker processes.
+    if os.getenv("ALEMBIC_FORK_WORKERS"):
+        pool_options = {"poolclass": pool.NullPool}
+    else:
+        pool_options = {"poolclass": pool.QueuePool, "pool_pre_ping": True}
+
     connectable = engine_from_config(
         configuration,
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        **pool_options,
     )
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
             compare_type=True,  # Detect column type changes
             compare_server_default=True,  # Detect default value changes
         )
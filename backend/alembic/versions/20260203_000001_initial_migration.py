@@ -10,6 +10,7 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # revision identifiers, used by Alembic.
 revision: str = '0001'
@@ -18,30 +19,32 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
-def upgrade() -> None:
-    # Create subscription tier enum
-    subscription_tier = postgresql.ENUM('tier_1', 'tier_2', 'tier_3', name='subscriptiontier')
-    subscription_tier.create(op.get_bind())
-    
-    # Create application status enum
-    application_status = postgresql.ENUM(
-        'draft', 'in_progress', 'review', 'submitted', 
-        'approved', 'rejected', 'funded',
-        name='applicationstatus'
-    )
-    application_status.create(op.get_bind())
-    
-    # Create document type enum
-    document_type = postgresql.ENUM(
-        'application', 'supporting_document', 'contract', 
-        'invoice', 'report', 'other',
-        name='documenttype'
-    )
-    document_type.create(op.get_bind())
+# Enum types, created up front so the tables below can reference them
+SUBSCRIPTION_TIERS = ('tier_1', 'tier_2', 'tier_3')
+APPLICATION_STATUSES = (
+    'draft', 'in_progress', 'review', 'submitted',
+    'approved', 'rejected', 'funded',
+)
+DOCUMENT_TYPES = (
+    'application', 'supporting_document', 'contract',
+    'invoice', 'report', 'other',
+)
+
+ENUM_TYPES = {
+    'subscriptiontier': SUBSCRIPTION_TIERS,
+    'applicationstatus': APPLICATION_STATUSES,
+    'documenttype': DOCUMENT_TYPES,
+}
 
-    # Create users table
-    op.create_table(
+
+def _build_schema() -> sa.MetaData:
+    """Describe the initial schema as plain SQLAlchemy tables and indexes."""
+    metadata = sa.MetaData()
+
+    # Users table
+    sa.Table(
         'users',
+        metadata,
         sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column('email', sa.String(), nullable=False, unique=True, index=True),
         sa.Column('password_hash', sa.String(), nullable=False),
@@ -52,7 +55,7 @@ def upgrade() -> None:
         sa.Column('annual_revenue', sa.Integer(), nullable=True),
         sa.Column('location', sa.String(), nullable=True),
         sa.Column('technology_stack', sa.String(), nullable=True),
-        sa.Column('subscription_tier', sa.Enum('tier_1', 'tier_2', 'tier_3', name='subscriptiontier'), nullable=False, default='tier_1'),
+        sa.Column('subscription_tier', sa.Enum(*SUBSCRIPTION_TIERS, name='subscriptiontier'), nullable=False, default='tier_1'),
         sa.Column('is_active', sa.Boolean(), nullable=False, default=True),
         sa.Column('is_verified', sa.Boolean(), nullable=False, default=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
@@ -60,19 +63,20 @@ def upgrade() -> None:
         sa.Column('last_login', sa.DateTime(), nullable=True),
     )
 
-    # Create grants table
-    op.create_table(
+    # Grants table
+    sa.Table(
         'grants',
+        metadata,
         sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column('external_id', sa.String(), nullable=True, index=True),
-        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False, index=True),
         sa.Column('anbieter', sa.String(), nullable=True),
-        sa.Column('ebene', sa.String(), nullable=True),  # bund, land, eu
+        sa.Column('ebene', sa.String(), nullable=True, index=True),  # bund, land, eu
         sa.Column('beschreibung', sa.Text(), nullable=True),
         sa.Column('foerderhoehe_min', sa.Float(), nullable=True),
         sa.Column('foerderhoehe_max', sa.Float(), nullable=True),
         sa.Column('foerderquote', sa.Float(), nullable=True),
-        sa.Column('foerderart', sa.String(), nullable=True),  # zuschuss, kredit, etc.
+        sa.Column('foerderart', sa.String(), nullable=True, index=True),  # zuschuss, kredit, etc.
         sa.Column('zielgruppe', postgresql.JSONB(), nullable=True),
         sa.Column('foerdergegenstand', postgresql.ARRAY(sa.String()), nullable=True),
         sa.Column('deadline', sa.DateTime(), nullable=True),
@@ -83,19 +87,15 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
     )
-    
-    # Create index for grant searching
-    op.create_index('ix_grants_name', 'grants', ['name'])
-    op.create_index('ix_grants_ebene', 'grants', ['ebene'])
-    op.create_index('ix_grants_foerderart', 'grants', ['foerderart'])
-
-    # Create applications table
-    op.create_table(
+
+    # Applications table
+    sa.Table(
         'applications',
+        metadata,
         sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
-        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
-        sa.Column('grant_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('grants.id'), nullable=False),
-        sa.Column('status', sa.Enum('draft', 'in_progress', 'review', 'submitted', 'approved', 'rejected', 'funded', name='applicationstatus'), nullable=False, default='draft'),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True),
+        sa.Column('grant_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('grants.id'), nullable=False, index=True),
+        sa.Column('status', sa.Enum(*APPLICATION_STATUSES, name='applicationstatus'), nullable=False, default='draft', index=True),
         sa.Column('project_name', sa.String(), nullable=False),
         sa.Column('project_description', sa.Text(), nullable=True),
         sa.Column('requested_amount', sa.Float(), nullable=True),
@@ -107,62 +107,76 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
     )
-    
-    op.create_index('ix_applications_user_id', 'applications', ['user_id'])
-    op.create_index('ix_applications_grant_id', 'applications', ['grant_id'])
-    op.create_index('ix_applications_status', 'applications', ['status'])
 
-    # Create documents table
-    op.create_table(
+    # Documents table
+    sa.Table(
         'documents',
+        metadata,
         sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
-        sa.Column('application_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('application_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False, index=True),
         sa.Column('filename', sa.String(), nullable=False),
         sa.Column('file_path', sa.String(), nullable=False),
         sa.Column('file_size', sa.Integer(), nullable=True),
         sa.Column('mime_type', sa.String(), nullable=True),
-        sa.Column('document_type', sa.Enum('application', 'supporting_document', 'contract', 'invoice', 'report', 'other', name='documenttype'), nullable=False, default='other'),
+        sa.Column('document_type', sa.Enum(*DOCUMENT_TYPES, name='documenttype'), nullable=False, default='other'),
         sa.Column('ai_generated', sa.Boolean(), default=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
     )
-    
-    op.create_index('ix_documents_application_id', 'documents', ['application_id'])
 
-    # Create change_log table for tracking program changes
-    op.create_table(
+    # Change log table for tracking program changes
+    sa.Table(
         'change_log',
+        metadata,
         sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column('grant_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('grants.id'), nullable=True),
-        sa.Column('source_url', sa.String(), nullable=False),
-        sa.Column('change_type', sa.String(), nullable=False),  # new_program, updated, expired, etc.
+        sa.Column('source_url', sa.String(), nullable=False, index=True),
+        sa.Column('change_type', sa.String(), nullable=False, index=True),  # new_program, updated, expired, etc.
         sa.Column('old_hash', sa.String(), nullable=True),
         sa.Column('new_hash', sa.String(), nullable=False),
         sa.Column('changed_fields', postgresql.ARRAY(sa.String()), nullable=True),
         sa.Column('description', sa.Text(), nullable=True),
         sa.Column('confidence', sa.Float(), nullable=True),
-        sa.Column('requires_review', sa.Boolean(), default=True),
+        sa.Column('requires_review', sa.Boolean(), default=True, index=True),
         sa.Column('reviewed', sa.Boolean(), default=False),
         sa.Column('reviewed_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=True),
         sa.Column('reviewed_at', sa.DateTime(), nullable=True),
         sa.Column('detected_at', sa.DateTime(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
     )
-    
-    op.create_index('ix_change_log_source_url', 'change_log', ['source_url'])
-    op.create_index('ix_change_log_change_type', 'change_log', ['change_type'])
-    op.create_index('ix_change_log_requires_review', 'change_log', ['requires_review'])
+
+    return metadata
+
+
+def _compile(element) -> str:
+    """Render a DDL construct for the dialect of the current migration context."""
+    return str(element.compile(dialect=op.get_context().dialect)).strip()
+
+
+def upgrade() -> None:
+    # Collect the whole schema into one script so it is sent to the server
+    # in a single round-trip instead of one per CREATE statement.
+    statements = [
+        "CREATE TYPE {} AS ENUM ({})".format(
+            name, ", ".join(f"'{value}'" for value in values)
+        )
+        for name, values in ENUM_TYPES.items()
+    ]
+
+    for table in _build_schema().sorted_tables:
+        statements.append(_compile(CreateTable(table)))
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            statements.append(_compile(CreateIndex(index)))
+
+    op.execute(";\n".join(statements))
 
 
 def downgrade() -> None:
-    # Drop tables in reverse order
-    op.drop_table('change_log')
-    op.drop_table('documents')
-    op.drop_table('applications')
-    op.drop_table('grants')
-    op.drop_table('users')
-    
-    # Drop enums
-    op.execute('DROP TYPE IF EXISTS documenttype')
-    op.execute('DROP TYPE IF EXISTS applicationstatus')
-    op.execute('DROP TYPE IF EXISTS subscriptiontier')
+    # Drop tables in reverse dependency order, then the enum types
+    statements = [
+        f"DROP TABLE {table.name}"
+        for table in reversed(_build_schema().sorted_tables)
+    ]
+    statements.extend(f"DROP TYPE IF EXISTS {name}" for name in reversed(ENUM_TYPES))
+
+    op.execute(";\n".join(statements))
@@ -0,0 +1,39 @@
+"""Composite index for the application list endpoint
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # list_applications filters on user_id (+ optional status) and pages by
+    # (created_at, id) DESC. With a status filter this index serves it
+    # without a sort step; without one, status sits between user_id and
+    # created_at, so the rows still need sorting (0009 adds an index for
+    # that case). It makes the single-column user_id/status indexes
+    # redundant.
+    op.create_index(
+        'ix_applications_user_status_created',
+        'applications',
+        ['user_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.drop_index('ix_applications_user_id', table_name='applications')
+    op.drop_index('ix_applications_status', table_name='applications')
+
+
+def downgrade() -> None:
+    op.create_index('ix_applications_status', 'applications', ['status'])
+    op.create_index('ix_applications_user_id', 'applications', ['user_id'])
+    op.drop_index('ix_applications_user_status_created', table_name='applications')
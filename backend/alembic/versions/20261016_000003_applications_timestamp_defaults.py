@@ -0,0 +1,29 @@
+"""Server-side timestamp defaults on applications
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Let the database stamp timestamps so INSERT ... RETURNING hands them
+    # back without a follow-up SELECT.
+    op.alter_column('applications', 'created_at', server_default=sa.func.now())
+    op.alter_column('applications', 'updated_at', server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    op.alter_column('applications', 'updated_at', server_default=None)
+    op.alter_column('applications', 'created_at', server_default=None)
@@ -0,0 +1,495 @@
+"""Align the initial schema with the models
+
+Revision ID: 0003a
+Revises: 0003
+Create Date: 2026-10-16 00:00:03
+
+0001 created an earlier draft of the schema that no later revision
+matches. This revision converts it in place:
+
+- Enum labels are translated to the models' labels. Where several old
+  labels collapse into one (status 'funded' becomes APPROVED; document
+  types 'supporting_document', 'contract', 'invoice' and 'report' become
+  APPROVAL_NOTICE), the original label is kept in legacy_0003a_values.
+- Values of dropped columns (anbieter, ebene, foerderart, mime_type, ...)
+  are kept in legacy_0003a_values as well.
+- Grant type is derived from ebene, grant category from foerdergegenstand
+  (or the description) with the keywords the API uses for Qdrant grants.
+
+Downgrade restores the kept labels and column values. It cannot restore
+what only exists after the upgrade: labels without an old equivalent
+(READY, IN_REVIEW, WITHDRAWN, the generated document types) map to the
+nearest old label, and applications whose grant has no grants row keep a
+NULL grant_id, so grant_id stays nullable. No rows are deleted; the grant
+references of those applications stay in legacy_0003a_values for the next
+upgrade, and the table is dropped once it holds nothing else.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0003a'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 0001 created an earlier draft of the schema; the models (and every later
+# revision) expect the one below. SQLAlchemy stores Python enums by member
+# name, so the enum labels are upper case.
+SUBSCRIPTION_TIERS = ('TIER_1', 'TIER_2', 'TIER_3')
+APPLICATION_STATUSES = (
+    'DRAFT', 'GENERATING', 'REVIEW', 'READY', 'SUBMITTED',
+    'IN_REVIEW', 'APPROVED', 'REJECTED', 'WITHDRAWN',
+)
+DOCUMENT_TYPES = (
+    'FULL_APPLICATION', 'PROJECT_DESCRIPTION', 'MARKET_ANALYSIS',
+    'TECHNICAL_FEASIBILITY', 'WORK_PLAN', 'FINANCIAL_PLAN',
+    'RISK_MANAGEMENT', 'UTILIZATION_PLAN', 'APPROVAL_NOTICE',
+)
+DOCUMENT_FORMATS = ('PDF', 'DOCX', 'TXT', 'JSON')
+GRANT_TYPES = ('FEDERAL', 'STATE', 'EU', 'MUNICIPAL')
+GRANT_CATEGORIES = (
+    'INNOVATION', 'DIGITALIZATION', 'GREEN_TECH',
+    'EXPORT', 'TRAINING', 'REGIONAL',
+)
+
+# Enum types 0001 created with other labels: (table, column, new labels,
+# old label -> new label, new label -> old label for downgrade)
+REPLACED_ENUMS = {
+    'subscriptiontier': (
+        'users', 'subscription_tier', SUBSCRIPTION_TIERS,
+        {'tier_1': 'TIER_1', 'tier_2': 'TIER_2', 'tier_3': 'TIER_3'},
+        {'TIER_1': 'tier_1', 'TIER_2': 'tier_2', 'TIER_3': 'tier_3'},
+    ),
+    'applicationstatus': (
+        'applications', 'status', APPLICATION_STATUSES,
+        {
+            'draft': 'DRAFT', 'in_progress': 'GENERATING', 'review': 'REVIEW',
+            'submitted': 'SUBMITTED', 'approved': 'APPROVED',
+            'rejected': 'REJECTED', 'funded': 'APPROVED',
+        },
+        {
+            'DRAFT': 'draft', 'GENERATING': 'in_progress', 'REVIEW': 'review',
+            'READY': 'review', 'SUBMITTED': 'submitted', 'IN_REVIEW': 'submitted',
+            'APPROVED': 'approved', 'REJECTED': 'rejected', 'WITHDRAWN': 'rejected',
+        },
+    ),
+    # Uploads become APPROVAL_NOTICE, the only document type users upload
+    'documenttype': (
+        'documents', 'document_type', DOCUMENT_TYPES,
+        {
+            'application': 'FULL_APPLICATION', 'supporting_document': 'APPROVAL_NOTICE',
+            'contract': 'APPROVAL_NOTICE', 'invoice': 'APPROVAL_NOTICE',
+            'report': 'APPROVAL_NOTICE', 'other': 'APPROVAL_NOTICE',
+        },
+        {
+            **{label: 'application' for label in DOCUMENT_TYPES},
+            'APPROVAL_NOTICE': 'other',
+        },
+    ),
+}
+OLD_ENUM_LABELS = {
+    'subscriptiontier': ('tier_1', 'tier_2', 'tier_3'),
+    'applicationstatus': (
+        'draft', 'in_progress', 'review', 'submitted',
+        'approved', 'rejected', 'funded',
+    ),
+    'documenttype': (
+        'application', 'supporting_document', 'contract',
+        'invoice', 'report', 'other',
+    ),
+}
+NEW_ENUMS = {
+    'documentformat': DOCUMENT_FORMATS,
+    'granttype': GRANT_TYPES,
+    'grantcategory': GRANT_CATEGORIES,
+}
+
+# (old name, new name) of columns that only changed their name
+RENAMED_COLUMNS = {
+    'grants': (
+        ('beschreibung', 'description'),
+        ('foerderhoehe_min', 'min_funding'),
+        ('foerderhoehe_max', 'max_funding'),
+        ('url_offiziell', 'website_url'),
+    ),
+    'applications': (
+        ('project_name', 'project_title'),
+        ('requested_amount', 'requested_funding'),
+        ('approved_amount', 'approved_funding'),
+        ('ai_generated_content', 'generated_content'),
+    ),
+    'documents': (
+        ('ai_generated', 'generated_by_ai'),
+    ),
+}
+
+# Nullable columns the models have and 0001 did not
+ADDED_COLUMNS = {
+    'grants': (
+        ('min_own_contribution_percent', sa.Float()),
+        ('guidelines', sa.Text()),
+        ('eligibility', sa.JSON()),
+        ('requirements', sa.JSON()),
+        ('application_process', sa.Text()),
+        ('duration_months', sa.Integer()),
+        ('historical_success_rate', sa.Float()),
+        ('avg_funded_amount', sa.Float()),
+        ('contact_info', sa.JSON()),
+        ('embedding_metadata', sa.JSON()),
+    ),
+    'applications': (
+        ('project_goals', sa.JSON()),
+        ('project_innovation', sa.Text()),
+        ('project_technology', sa.Text()),
+        ('budget_breakdown', sa.JSON()),
+        ('team_info', sa.JSON()),
+        ('target_audience', sa.Text()),
+        ('market_analysis', sa.Text()),
+        ('business_model', sa.Text()),
+        ('compliance_score', sa.Float()),
+        ('compliance_checks', sa.JSON()),
+        ('tracking_number', sa.String()),
+        ('rejected_at', sa.DateTime()),
+        ('commission_rate', sa.Float()),
+        ('commission_amount', sa.Float()),
+        ('commission_paid_at', sa.DateTime()),
+    ),
+    'documents': (
+        ('generation_duration_seconds', sa.Integer()),
+    ),
+}
+
+# Columns that become NOT NULL, with the value existing rows get
+NOT_NULL_BACKFILLS = {
+    'grants': (
+        ('external_id', 'id::text'),
+        ('description', "''"),
+        ('max_funding', '0'),
+        ('is_continuous', 'FALSE'),
+    ),
+    'applications': (
+        ('project_description', "''"),
+        ('requested_funding', '0'),
+    ),
+    'documents': (
+        ('generated_by_ai', 'FALSE'),
+    ),
+}
+
+# NOT NULL columns the models have and 0001 did not, with the value
+# existing rows get; the server default only serves the backfill
+REQUIRED_COLUMNS = {
+    'applications': (
+        ('timeline_months', sa.Integer(), '0'),
+        ('total_budget', sa.Float(), '0'),
+        ('own_contribution', sa.Float(), '0'),
+        ('completion_percentage', sa.Integer(), '0'),
+        ('commission_paid', sa.Boolean(), 'FALSE'),
+    ),
+    'documents': (
+        ('version', sa.Integer(), '1'),
+        ('is_latest', sa.Boolean(), 'TRUE'),
+    ),
+}
+
+# 0001 columns the models no longer have
+DROPPED_COLUMNS = {
+    'grants': (
+        ('anbieter', sa.String()),
+        ('ebene', sa.String()),
+        ('foerderquote', sa.Float()),
+        ('foerderart', sa.String()),
+        ('zielgruppe', postgresql.JSONB()),
+        ('foerdergegenstand', postgresql.ARRAY(sa.String())),
+        ('source', sa.String()),
+        ('status', sa.String()),
+    ),
+    'applications': (
+        ('ai_match_score', sa.Float()),
+    ),
+    'documents': (
+        ('mime_type', sa.String()),
+        ('updated_at', sa.DateTime()),
+    ),
+}
+
+# Keeps what the upgrade would otherwise lose, for downgrade: one JSON
+# object per row with its dropped column values and collapsed enum labels
+LEGACY_TABLE = 'legacy_0003a_values'
+
+# Old labels that do not survive an upgrade and downgrade round trip
+LOSSY_LABELS = {
+    name: tuple(old for old, new in mapping.items() if reverse_mapping[new] != old)
+    for name, (_, _, _, mapping, reverse_mapping) in REPLACED_ENUMS.items()
+}
+
+# Grant category keywords, matched in order against what a grant funds;
+# the same rules (and DIGITALIZATION default) the API applies to Qdrant grants
+CATEGORY_KEYWORDS = (
+    ('INNOVATION', 'innovation|forschung'),
+    ('DIGITALIZATION', 'digital'),
+    ('GREEN_TECH', 'klima|umwelt|energie'),
+    ('EXPORT', 'export|internationalisierung'),
+    ('TRAINING', 'weiterbildung|qualifizierung|schulung'),
+)
+
+FORMAT_BY_MIME_TYPE = {
+    'application/pdf': 'PDF',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'DOCX',
+    'text/plain': 'TXT',
+    'application/json': 'JSON',
+}
+
+
+def _case(column: str, mapping: dict, default: str) -> str:
+    """SQL CASE expression translating the values of column."""
+    whens = " ".join(f"WHEN '{old}' THEN '{new}'" for old, new in mapping.items())
+    return f"CASE {column} {whens} ELSE '{default}' END"
+
+
+def _create_enum(name: str, labels: Sequence[str]) -> None:
+    op.execute(
+        "CREATE TYPE {} AS ENUM ({})".format(name, ", ".join(f"'{label}'" for label in labels))
+    )
+
+
+def _replace_enum(name: str, table: str, column: str, labels: Sequence[str], mapping: dict) -> None:
+    """Recreate enum type name with labels, translating column's values."""
+    op.execute(f"ALTER TYPE {name} RENAME TO {name}_old")
+    _create_enum(name, labels)
+    op.execute(
+        f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {name} "
+        f"USING ({_case(f'{column}::text', mapping, labels[0])})::{name}"
+    )
+    op.execute(f"DROP TYPE {name}_old")
+
+
+def _legacy_fields(table: str) -> dict:
+    """JSON key -> SQL expression of the values table loses in the upgrade."""
+    fields = {name: name for name, _ in DROPPED_COLUMNS.get(table, ())}
+    for name, (enum_table, column, _, _, _) in REPLACED_ENUMS.items():
+        if enum_table == table and LOSSY_LABELS[name]:
+            lossy = ", ".join(f"'{label}'" for label in LOSSY_LABELS[name])
+            fields[column] = f"CASE WHEN {column}::text IN ({lossy}) THEN {column}::text END"
+    return fields
+
+
+def _merge_legacy_values(table: str, select: str) -> None:
+    """Add the (id, data) rows of select to the legacy JSON of table's rows."""
+    op.execute(
+        f"INSERT INTO {LEGACY_TABLE} (table_name, row_id, data) "
+        f"SELECT '{table}', id, data FROM ({select}) AS legacy WHERE data <> '{{}}'::jsonb "
+        f"ON CONFLICT (table_name, row_id) DO UPDATE SET data = {LEGACY_TABLE}.data || EXCLUDED.data"
+    )
+
+
+def _save_legacy_values() -> None:
+    # May already exist, holding grant references an earlier downgrade kept
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {LEGACY_TABLE} ("
+        "table_name VARCHAR NOT NULL, row_id UUID NOT NULL, data JSONB NOT NULL, "
+        "PRIMARY KEY (table_name, row_id))"
+    )
+    for table in DROPPED_COLUMNS:
+        pairs = ", ".join(f"'{key}', {expr}" for key, expr in _legacy_fields(table).items())
+        _merge_legacy_values(table, f"SELECT id, jsonb_strip_nulls(jsonb_build_object({pairs})) AS data FROM {table}")
+
+
+def _legacy_value(name: str, type_: sa.types.TypeEngine) -> str:
+    """SQL expression reading column name back from the legacy JSON."""
+    if isinstance(type_, postgresql.JSONB):
+        return f"legacy.data -> '{name}'"
+    if isinstance(type_, postgresql.ARRAY):
+        return f"ARRAY(SELECT jsonb_array_elements_text(legacy.data -> '{name}'))"
+    return f"(legacy.data ->> '{name}')::{type_.compile(dialect=postgresql.dialect())}"
+
+
+def _restore_legacy_values() -> None:
+    """Put dropped column values back; run once the columns exist again."""
+    for table, columns in DROPPED_COLUMNS.items():
+        assignments = ", ".join(
+            f"{name} = CASE WHEN legacy.data ? '{name}' THEN {_legacy_value(name, type_)} ELSE {table}.{name} END"
+            for name, type_ in columns
+        )
+        op.execute(
+            f"UPDATE {table} SET {assignments} FROM {LEGACY_TABLE} AS legacy "
+            f"WHERE legacy.table_name = '{table}' AND legacy.row_id = {table}.id"
+        )
+
+
+def _restore_legacy_labels() -> None:
+    """Put collapsed enum labels back on rows that still hold their mapped value."""
+    for name, (table, column, _, mapping, reverse_mapping) in REPLACED_ENUMS.items():
+        for label in LOSSY_LABELS[name]:
+            op.execute(
+                f"UPDATE {table} SET {column} = '{label}' FROM {LEGACY_TABLE} AS legacy "
+                f"WHERE legacy.table_name = '{table}' AND legacy.row_id = {table}.id "
+                f"AND legacy.data ->> '{column}' = '{label}' "
+                f"AND {table}.{column} = '{reverse_mapping[mapping[label]]}'"
+            )
+
+
+def upgrade() -> None:
+    _save_legacy_values()
+    for name, (table, column, labels, mapping, _) in REPLACED_ENUMS.items():
+        _replace_enum(name, table, column, labels, mapping)
+    for name, labels in NEW_ENUMS.items():
+        _create_enum(name, labels)
+
+    for table, columns in RENAMED_COLUMNS.items():
+        for old_name, new_name in columns:
+            op.alter_column(table, old_name, new_column_name=new_name)
+    for table, columns in ADDED_COLUMNS.items():
+        for name, type_ in columns:
+            op.add_column(table, sa.Column(name, type_, nullable=True))
+    for table, columns in REQUIRED_COLUMNS.items():
+        for name, type_, value in columns:
+            op.add_column(table, sa.Column(name, type_, nullable=False, server_default=sa.text(value)))
+            op.alter_column(table, name, server_default=None)
+    for table, columns in NOT_NULL_BACKFILLS.items():
+        for name, value in columns:
+            op.execute(f"UPDATE {table} SET {name} = {value} WHERE {name} IS NULL")
+            op.alter_column(table, name, nullable=False)
+
+    # Grants: type is derived from the old ebene column, category from what
+    # the grant funds
+    op.add_column('grants', sa.Column('type', postgresql.ENUM(name='granttype', create_type=False), nullable=True))
+    op.add_column('grants', sa.Column('category', postgresql.ENUM(name='grantcategory', create_type=False), nullable=True))
+    ebene = _case('lower(ebene)', {'bund': 'FEDERAL', 'land': 'STATE', 'eu': 'EU', 'kommune': 'MUNICIPAL'}, 'FEDERAL')
+    funded = "coalesce(nullif(array_to_string(foerdergegenstand, ' '), ''), description, '')"
+    category = "CASE {} ELSE 'DIGITALIZATION' END".format(
+        " ".join(f"WHEN {funded} ~* '{pattern}' THEN '{label}'" for label, pattern in CATEGORY_KEYWORDS)
+    )
+    op.execute(f"UPDATE grants SET type = ({ebene})::granttype, category = ({category})::grantcategory")
+    op.alter_column('grants', 'type', nullable=False)
+    op.alter_column('grants', 'category', nullable=False)
+    op.create_index('ix_grants_type', 'grants', ['type'])
+    op.create_index('ix_grants_category', 'grants', ['category'])
+    op.drop_index('ix_grants_name', table_name='grants')
+    op.drop_index('ix_grants_external_id', table_name='grants')
+    op.create_index('ix_grants_external_id', 'grants', ['external_id'], unique=True)
+
+    # Applications reference grants by external ID instead of row ID
+    op.add_column('applications', sa.Column('grant_external_id', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE applications SET grant_external_id = grants.external_id "
+        "FROM grants WHERE grants.id = applications.grant_id"
+    )
+    op.execute(
+        f"UPDATE applications SET grant_external_id = legacy.data ->> 'grant_external_id' "
+        f"FROM {LEGACY_TABLE} AS legacy WHERE legacy.table_name = 'applications' "
+        "AND legacy.row_id = applications.id AND applications.grant_external_id IS NULL"
+    )
+    op.alter_column('applications', 'grant_external_id', nullable=False)
+    op.create_index('ix_applications_grant_external_id', 'applications', ['grant_external_id'])
+    op.drop_column('applications', 'grant_id')
+    op.execute(
+        "ALTER TABLE applications ALTER COLUMN generated_content TYPE JSON "
+        "USING generated_content::json"
+    )
+
+    # Documents: format from the MIME type; older versions of the same
+    # document are numbered and lose is_latest, as generate_document does
+    op.add_column('documents', sa.Column('format', postgresql.ENUM(name='documentformat', create_type=False), nullable=True))
+    op.execute(f"UPDATE documents SET format = ({_case('mime_type', FORMAT_BY_MIME_TYPE, 'PDF')})::documentformat")
+    op.alter_column('documents', 'format', nullable=False)
+    op.execute(
+        "UPDATE documents SET version = versions.version, "
+        "is_latest = versions.version = versions.latest "
+        "FROM ("
+        "SELECT id, row_number() OVER w AS version, count(*) OVER w_all AS latest "
+        "FROM documents "
+        "WINDOW w_all AS (PARTITION BY application_id, document_type, format), "
+        "w AS (w_all ORDER BY created_at, id)"
+        ") AS versions WHERE versions.id = documents.id"
+    )
+
+    for table, columns in DROPPED_COLUMNS.items():
+        for name, _ in columns:
+            op.drop_column(table, name)
+
+
+def downgrade() -> None:
+    for table, columns in DROPPED_COLUMNS.items():
+        for name, type_ in columns:
+            op.add_column(table, sa.Column(name, type_, nullable=True))
+    # Rows created after the upgrade have no legacy values to restore
+    op.execute(
+        "UPDATE documents SET updated_at = created_at, mime_type = "
+        + _case('format::text', {new: old for old, new in FORMAT_BY_MIME_TYPE.items()}, 'application/pdf')
+    )
+    op.execute(
+        "UPDATE grants SET ebene = "
+        + _case('type::text', {'FEDERAL': 'bund', 'STATE': 'land', 'EU': 'eu', 'MUNICIPAL': 'kommune'}, 'bund')
+    )
+    _restore_legacy_values()
+    op.alter_column('documents', 'updated_at', nullable=False)
+    op.drop_column('documents', 'format')
+
+    op.execute(
+        "ALTER TABLE applications ALTER COLUMN generated_content TYPE JSONB "
+        "USING generated_content::jsonb"
+    )
+    op.add_column('applications', sa.Column('grant_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.execute(
+        "UPDATE applications SET grant_id = grants.id "
+        "FROM grants WHERE grants.external_id = applications.grant_external_id"
+    )
+    # Applications whose grant only exists in Qdrant cannot be linked back;
+    # they are kept with a NULL grant_id rather than deleted
+    op.create_foreign_key('applications_grant_id_fkey', 'applications', 'grants', ['grant_id'], ['id'])
+    op.create_index('ix_applications_grant_id', 'applications', ['grant_id'])
+    _merge_legacy_values(
+        'applications',
+        "SELECT id, jsonb_build_object('grant_external_id', grant_external_id) AS data "
+        "FROM applications WHERE grant_id IS NULL"
+    )
+    op.drop_index('ix_applications_grant_external_id', table_name='applications')
+    op.drop_column('applications', 'grant_external_id')
+
+    op.drop_index('ix_grants_external_id', table_name='grants')
+    op.create_index('ix_grants_external_id', 'grants', ['external_id'])
+    op.create_index('ix_grants_name', 'grants', ['name'])
+    op.create_index('ix_grants_ebene', 'grants', ['ebene'])
+    op.create_index('ix_grants_foerderart', 'grants', ['foerderart'])
+    op.drop_index('ix_grants_category', table_name='grants')
+    op.drop_index('ix_grants_type', table_name='grants')
+    op.drop_column('grants', 'category')
+    op.drop_column('grants', 'type')
+
+    for table, columns in NOT_NULL_BACKFILLS.items():
+        for name, _ in columns:
+            op.alter_column(table, name, nullable=True)
+    for table, columns in REQUIRED_COLUMNS.items():
+        for name, _, _ in columns:
+            op.drop_column(table, name)
+    for table, columns in ADDED_COLUMNS.items():
+        for name, _ in columns:
+            op.drop_column(table, name)
+    for table, columns in RENAMED_COLUMNS.items():
+        for old_name, new_name in columns:
+            op.alter_column(table, new_name, new_column_name=old_name)
+
+    for name in NEW_ENUMS:
+        op.execute(f"DROP TYPE {name}")
+    for name, (table, column, _, _, reverse_mapping) in REPLACED_ENUMS.items():
+        labels = OLD_ENUM_LABELS[name]
+        _replace_enum(name, table, column, labels, reverse_mapping)
+    _restore_legacy_labels()
+    # Keep only the grant references of unlinked applications, for the next
+    # upgrade; the table goes away when there are none
+    op.execute(
+        f"DELETE FROM {LEGACY_TABLE} WHERE table_name <> 'applications' "
+        f"OR NOT data ? 'grant_external_id' "
+        f"OR row_id IN (SELECT id FROM applications WHERE grant_id IS NOT NULL)"
+    )
+    op.execute(f"UPDATE {LEGACY_TABLE} SET data = jsonb_build_object('grant_external_id', data -> 'grant_external_id')")
+    op.execute(
+        f"DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM {LEGACY_TABLE}) "
+        f"THEN DROP TABLE {LEGACY_TABLE}; END IF; END $$"
+    )
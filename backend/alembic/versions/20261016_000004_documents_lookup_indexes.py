@@ -0,0 +1,46 @@
+"""Indexes for document lookups
+
+Revision ID: 0004
+Revises: 0003a
+Create Date: 2026-10-16 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # generate_document looks for the latest document of a given type and
+    # format; only is_latest rows are ever searched, so index just those.
+    # if_not_exists: the API's startup create_all may already have built
+    # these from the model definitions.
+    op.create_index(
+        'ix_documents_app_type_fmt_latest',
+        'documents',
+        ['application_id', 'document_type', 'format'],
+        postgresql_where=sa.text('is_latest = TRUE'),
+        if_not_exists=True,
+    )
+    # list_application_documents returns an application's documents newest
+    # first; this also covers plain application_id lookups.
+    op.create_index(
+        'ix_documents_application_id_created_at',
+        'documents',
+        ['application_id', sa.text('created_at DESC')],
+        if_not_exists=True,
+    )
+    op.drop_index('ix_documents_application_id', table_name='documents', if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_documents_application_id', 'documents', ['application_id'], if_not_exists=True)
+    op.drop_index('ix_documents_application_id_created_at', table_name='documents')
+    op.drop_index('ix_documents_app_type_fmt_latest', table_name='documents')
@@ -0,0 +1,40 @@
+"""Make the latest-document index unique
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 00:00:05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # generate_document inserts with ON CONFLICT DO NOTHING against this
+    # index so concurrent identical requests create a single document.
+    op.drop_index('ix_documents_app_type_fmt_latest', table_name='documents')
+    op.create_index(
+        'ix_documents_app_type_fmt_latest',
+        'documents',
+        ['application_id', 'document_type', 'format'],
+        unique=True,
+        postgresql_where=sa.text('is_latest = TRUE'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_app_type_fmt_latest', table_name='documents')
+    op.create_index(
+        'ix_documents_app_type_fmt_latest',
+        'documents',
+        ['application_id', 'document_type', 'format'],
+        postgresql_where=sa.text('is_latest = TRUE'),
+    )
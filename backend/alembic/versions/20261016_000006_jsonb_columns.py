@@ -0,0 +1,58 @@
+"""Store JSON columns as JSONB
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 00:00:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSON_COLUMNS = {
+    'applications': (
+        'project_goals',
+        'budget_breakdown',
+        'team_info',
+        'generated_content',
+        'compliance_checks',
+    ),
+    'grants': (
+        'eligibility',
+        'requirements',
+        'contact_info',
+        'embedding_metadata',
+    ),
+}
+
+
+def upgrade() -> None:
+    # JSONB is stored pre-parsed, so reads skip re-parsing the JSON text
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table,
+                column,
+                type_=postgresql.JSONB(),
+                postgresql_using=f'{column}::jsonb',
+            )
+
+
+def downgrade() -> None:
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.JSON(),
+                postgresql_using=f'{column}::json',
+            )
@@ -0,0 +1,31 @@
+"""Snapshot grant name, type and max funding on applications
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 00:00:07
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled from Qdrant when an application is created; existing rows
+    # stay NULL since grants may have changed since
+    op.add_column('applications', sa.Column('grant_name', sa.String(), nullable=True))
+    op.add_column('applications', sa.Column('grant_type', sa.String(), nullable=True))
+    op.add_column('applications', sa.Column('grant_max_funding', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('applications', 'grant_max_funding')
+    op.drop_column('applications', 'grant_type')
+    op.drop_column('applications', 'grant_name')
@@ -0,0 +1,38 @@
+"""Database-side timestamp defaults for users, grants and documents
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 00:00:08
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TIMESTAMP_COLUMNS = (
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('grants', 'created_at'),
+    ('grants', 'updated_at'),
+    ('documents', 'created_at'),
+)
+
+
+def upgrade() -> None:
+    # Same as 0003 for applications: the database stamps new rows instead
+    # of the application sending a Python datetime with every INSERT.
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    for table, column in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(table, column, server_default=None)
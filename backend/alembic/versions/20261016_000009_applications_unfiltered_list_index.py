@@ -0,0 +1,32 @@
+"""Index for the unfiltered application list
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 00:00:09
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ix_applications_user_status_created has status between user_id and
+    # created_at, so it only yields (created_at, id) DESC order when status
+    # is filtered too. The default list filters on user_id alone.
+    op.create_index(
+        'ix_applications_user_created',
+        'applications',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_user_created', table_name='applications')
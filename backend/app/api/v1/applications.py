@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy import String, case, cast, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+import anyio
+import asyncio
+import base64
+import logging
+import orjson
+import time
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.models.application import Application as ApplicationModel, ApplicationStatus
 from app.models.user import User
 from app.api.v1.auth import get_current_user
-from app.tasks.application_tasks import generate_application_content
+from app.celery_app import celery_app
+from app.services.application_writer import (
+    SECTION_TYPES,
+    application_writer,
+    build_generation_inputs,
+    build_section_context
+)
+from app.services.grants_shape import build_grant_detail_dict, build_grant_guidelines
+from app.services.qdrant_service import qdrant_service
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 # Schemas
@@ -50,9 +67,19 @@ class ApplicationUpdate(BaseModel):
     requested_funding: Optional[float] = None
 
 
+class ApplicationBulkUpdateItem(BaseModel):
+    id: UUID
+    status: ApplicationStatus
+
+
 class ApplicationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: UUID
     grant_external_id: str
+    grant_name: Optional[str] = None
+    grant_type: Optional[str] = None
+    grant_max_funding: Optional[float] = None
     project_title: str
     project_description: str
     status: ApplicationStatus
@@ -61,9 +88,6 @@ class ApplicationResponse(BaseModel):
     requested_funding: float
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
 class ApplicationDetail(ApplicationResponse):
@@ -74,17 +98,164 @@ class ApplicationDetail(ApplicationResponse):
     team_info: Optional[Dict[str, Any]]
     generated_content: Optional[Dict[str, str]]
     compliance_score: Optional[float]
+
+
+# Built once so list responses skip per-request schema setup
+_application_list_adapter = TypeAdapter(List[ApplicationResponse])
+
+# How often a streamed section is written back while it is generated
+_STREAM_SAVE_INTERVAL = 2.0
+
+# Unfinished streamed text is kept under "<section>:partial" so it never
+# replaces a complete section; the key is dropped once the section finishes.
+_PARTIAL_SECTION_SUFFIX = ":partial"
+
+
+# Helpers
+async def get_user_application(db: AsyncSession, application_id: UUID, user: User) -> ApplicationModel:
+    """Get an application by primary key, ensuring it belongs to the user."""
+    application = await db.get(ApplicationModel, application_id)
+    
+    if not application or application.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+    
+    return application
+
+
+async def fetch_grant_snapshot(grant_id: str) -> Dict[str, Any]:
+    """Grant fields copied onto a new application; empty if the grant is unknown."""
+    try:
+        # Resolves point ids and, for importer-keyed points, grant URLs
+        results = await qdrant_service.retrieve_grants_async([grant_id])
+    except Exception as e:
+        # The snapshot is informational only; don't fail application creation
+        logger.warning("Error fetching grant snapshot for %s: %s", grant_id, e)
+        return {}
+    
+    if not results:
+        logger.warning("Grant %s not found; application created without a grant snapshot", grant_id)
+        return {}
+    
+    grant = build_grant_detail_dict(results[0]['payload'], grant_id)
+    return {
+        "grant_name": grant["name"],
+        "grant_type": grant["type"],
+        "grant_max_funding": grant["max_funding"]
+    }
+
+
+async def fetch_grant_guidelines(grant_id: str) -> str:
+    """Guideline text for the writer from the grant's Qdrant payload; empty if unavailable."""
+    try:
+        # Same lookup as the snapshot, including the URL fallback
+        results = await qdrant_service.retrieve_grants_async([grant_id])
+    except Exception as e:
+        # Generation still works without guidelines, just less specifically
+        logger.warning("Error fetching grant guidelines for %s: %s", grant_id, e)
+        return ""
+    
+    if not results:
+        logger.warning("Grant %s not found; generating without grant guidelines", grant_id)
+        return ""
+    
+    return build_grant_guidelines(results[0]['payload'])
+
+
+async def save_generated_section(
+    application_id: UUID,
+    section: str,
+    content: str,
+    partial: bool = False
+):
+    """
+    Merge one section into generated_content in its own session.
     
-    class Config:
-        from_attributes = True
+    Partial text is stored under the section's ":partial" key and leaves the
+    section itself untouched; complete text replaces the section and drops
+    that key.
+    """
+    partial_key = f"{section}{_PARTIAL_SECTION_SUFFIX}"
+    generated_content = func.coalesce(ApplicationModel.generated_content, literal({}, JSONB))
+    if partial:
+        values = {partial_key: content}
+    else:
+        values = {section: content}
+        generated_content = generated_content.op("-", return_type=JSONB)(literal(partial_key))
+    
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ApplicationModel)
+            .where(ApplicationModel.id == application_id)
+            .values(
+                generated_content=generated_content.op("||", return_type=JSONB)(literal(values, JSONB))
+            )
+        )
+        await db.commit()
+
+
+async def stream_generated_section(
+    application_id: UUID,
+    section: str,
+    context: Dict[str, Any]
+) -> AsyncIterator[str]:
+    """
+    Yield a section as Server-Sent Events while persisting it
+    
+    Partial text is saved every few seconds and again if the stream fails or
+    the client disconnects, so progress survives a dropped connection. It
+    only replaces the stored section once generation has finished.
+    """
+    parts: List[str] = []
+    saved = 0
+    last_save = time.monotonic()
+    
+    try:
+        async for chunk in application_writer.generate_section_stream(section, context):
+            parts.append(chunk)
+            yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+            
+            if time.monotonic() - last_save >= _STREAM_SAVE_INTERVAL:
+                await save_generated_section(application_id, section, "".join(parts), partial=True)
+                saved = len(parts)
+                last_save = time.monotonic()
+        
+        await save_generated_section(application_id, section, "".join(parts))
+        saved = len(parts)
+        yield "event: done\ndata: {}\n\n"
+        
+    finally:
+        if len(parts) != saved:
+            # The response is being cancelled; shield the final write
+            with anyio.CancelScope(shield=True):
+                await save_generated_section(application_id, section, "".join(parts), partial=True)
+
+
+def encode_cursor(application: ApplicationModel) -> str:
+    """Encode the (created_at, id) keyset position of an application."""
+    raw = f"{application.created_at.isoformat()}|{application.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        created_at, application_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(application_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 @router.post("/", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_application(
     application: ApplicationCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new grant application
@@ -98,10 +269,14 @@ async def create_application(
             detail="Requested funding cannot exceed total budget"
         )
     
-    # Create application in database
-    db_application = ApplicationModel(
+    grant_snapshot = await fetch_grant_snapshot(application.grant_id)
+    
+    # Create application in database; RETURNING hands back the generated
+    # id and timestamps so no refresh is needed
+    stmt = insert(ApplicationModel).values(
         user_id=current_user.id,
         grant_external_id=application.grant_id,
+        **grant_snapshot,
         project_title=application.project_title,
         project_description=application.project_description,
         project_goals=application.project_goals,
@@ -116,40 +291,68 @@ async def create_application(
         status=ApplicationStatus.DRAFT,
         completion_percentage=10,
         commission_rate=current_user.subscription_tier.value.get("commission_rate", 0.25)
-    )
+    ).returning(ApplicationModel)
     
-    db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    result = await db.execute(stmt)
+    db_application = result.scalar_one()
+    await db.commit()
     
-    # Start AI generation in background
-    background_tasks.add_task(
-        generate_application_content.delay,
-        str(db_application.id)
+    # Start AI generation in background (broker publish runs in a worker thread)
+    await asyncio.to_thread(
+        celery_app.send_task,
+        "generate_application_content",
+        args=[str(db_application.id)]
     )
     
     return db_application
 
 
+@router.patch("/bulk", response_model=List[ApplicationResponse])
+async def bulk_update_applications(
+    items: List[ApplicationBulkUpdateItem],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update the status of several applications at once
+    
+    All items are merged into a single UPDATE ... SET status = CASE id ...
+    statement. Applications not owned by the current user are skipped.
+    """
+    if not items:
+        return []
+    
+    status_column = ApplicationModel.status
+    new_status = case(
+        {item.id: literal(item.status, status_column.type) for item in items},
+        value=ApplicationModel.id
+    )
+    
+    stmt = (
+        update(ApplicationModel)
+        .where(
+            ApplicationModel.id.in_([item.id for item in items]),
+            ApplicationModel.user_id == current_user.id
+        )
+        .values(status=cast(new_status, status_column.type))
+        .returning(ApplicationModel)
+    )
+    
+    result = await db.execute(stmt)
+    applications = result.scalars().all()
+    await db.commit()
+    
+    return applications
+
+
 @router.get("/{application_id}", response_model=ApplicationDetail)
 async def get_application(
     application_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get detailed information about an application"""
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
-        )
-    ).first()
-    
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+    application = await get_user_application(db, application_id, current_user)
     
     return application
 
@@ -159,78 +362,80 @@ async def update_application(
     application_id: UUID,
     updates: ApplicationUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing application"""
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
-        )
-    ).first()
-    
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+    application = await get_user_application(db, application_id, current_user)
     
     # Update fields
-    update_data = updates.dict(exclude_unset=True)
+    update_data = updates.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(application, field, value)
     
-    application.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(application)
+    await db.commit()
+    await db.refresh(application)
     
     return application
 
 
-@router.get("/", response_model=List[ApplicationResponse])
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {"model": List[ApplicationResponse]}}
+)
 async def list_applications(
     status: Optional[ApplicationStatus] = None,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 20,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all applications for the current user"""
-    query = db.query(ApplicationModel).filter(
+    """
+    List all applications for the current user
+    
+    Uses keyset pagination on (created_at, id). When more results may
+    follow, the cursor for the next page is returned in the X-Next-Cursor
+    response header.
+    """
+    query = select(ApplicationModel).where(
         ApplicationModel.user_id == current_user.id
     )
     
     if status:
-        query = query.filter(ApplicationModel.status == status)
+        query = query.where(ApplicationModel.status == status)
     
-    query = query.order_by(ApplicationModel.created_at.desc())
-    query = query.offset(skip).limit(limit)
+    if cursor:
+        query = query.where(
+            tuple_(ApplicationModel.created_at, ApplicationModel.id) < tuple_(*decode_cursor(cursor))
+        )
     
-    applications = query.all()
+    query = query.order_by(ApplicationModel.created_at.desc(), ApplicationModel.id.desc())
+    query = query.limit(limit)
     
-    return applications
+    result = await db.execute(query)
+    applications = result.scalars().all()
+    
+    headers = {}
+    if applications and len(applications) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(applications[-1])
+    
+    return ORJSONResponse(
+        _application_list_adapter.dump_python(
+            _application_list_adapter.validate_python(applications, from_attributes=True),
+            mode="json"
+        ),
+        headers=headers
+    )
 
 
 @router.delete("/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_application(
     application_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an application (only if in draft status)"""
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
-        )
-    ).first()
-    
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+    application = await get_user_application(db, application_id, current_user)
     
     if application.status not in [ApplicationStatus.DRAFT, ApplicationStatus.GENERATING]:
         raise HTTPException(
@@ -238,8 +443,8 @@ async def delete_application(
             detail="Cannot delete application that has been submitted"
         )
     
-    db.delete(application)
-    db.commit()
+    await db.delete(application)
+    await db.commit()
     
     return None
 
@@ -248,9 +453,8 @@ async def delete_application(
 async def regenerate_application_content(
     application_id: UUID,
     section: Optional[str] = None,
-    background_tasks: BackgroundTasks = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Regenerate application content
@@ -258,28 +462,17 @@ async def regenerate_application_content(
     If section is provided, only that section is regenerated.
     Otherwise, the entire application is regenerated.
     """
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
-        )
-    ).first()
-    
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+    application = await get_user_application(db, application_id, current_user)
     
     # Trigger AI generation
-    background_tasks.add_task(
-        generate_application_content.delay,
-        str(application_id),
-        section
+    await asyncio.to_thread(
+        celery_app.send_task,
+        "generate_application_content",
+        args=[str(application_id), section, True]
     )
     
     application.status = ApplicationStatus.GENERATING
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Generation started",
@@ -288,45 +481,82 @@ async def regenerate_application_content(
     }
 
 
-@router.post("/{application_id}/submit")
-async def submit_application(
+@router.post("/{application_id}/generate/stream")
+async def stream_application_section(
     application_id: UUID,
+    section: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Submit application to grant provider"""
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
-        )
-    ).first()
+    """
+    Regenerate one section and stream it as Server-Sent Events
     
-    if not application:
+    Each event carries a JSON-encoded text chunk; a final "done" event
+    follows once the section is saved to generated_content. Unfinished text
+    is kept under "<section>:partial" instead.
+    """
+    if section not in SECTION_TYPES:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown section: {section}"
         )
     
+    application = await get_user_application(db, application_id, current_user)
+    project_info, budget_info = build_generation_inputs(application)
+    context = build_section_context(
+        project_info,
+        await fetch_grant_guidelines(application.grant_external_id),
+        budget_info,
+        application.timeline_months
+    )
+    
+    return StreamingResponse(
+        stream_generated_section(application_id, section, context),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/{application_id}/submit")
+async def submit_application(
+    application_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Submit application to grant provider"""
+    application = await get_user_application(db, application_id, current_user)
+    
     if application.status != ApplicationStatus.READY:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Application is not ready for submission"
         )
     
-    # Update status
-    application.status = ApplicationStatus.SUBMITTED
-    application.submitted_at = datetime.utcnow()
-    application.tracking_number = f"TRACK-{datetime.utcnow().strftime('%Y%m%d')}-{str(application_id)[:8].upper()}"
-    
-    db.commit()
-    db.refresh(application)
+    # Update status and derive TRACK-YYYYMMDD-<ID PREFIX> in the same statement
+    result = await db.execute(
+        update(ApplicationModel)
+        .where(ApplicationModel.id == application_id)
+        .values(
+            status=ApplicationStatus.SUBMITTED,
+            submitted_at=func.now(),
+            tracking_number=func.concat(
+                "TRACK-",
+                func.to_char(func.now(), "YYYYMMDD"),
+                "-",
+                func.upper(func.substr(cast(ApplicationModel.id, String), 1, 8))
+            )
+        )
+        .returning(ApplicationModel.tracking_number, ApplicationModel.submitted_at)
+    )
+    submitted = result.one()
+    await db.commit()
     
     return {
         "message": "Application submitted successfully",
         "application_id": str(application_id),
-        "tracking_number": application.tracking_number,
-        "submitted_at": application.submitted_at
+        "tracking_number": submitted.tracking_number,
+        "submitted_at": submitted.submitted_at
     }
 
 
@@ -5,23 +5,116 @@ Complete implementation with database integration.
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from uuid import UUID
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from uuid import UUID, uuid4
+from cachetools import TLRUCache, TTLCache
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from redis.exceptions import RedisError
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import bcrypt
+import hashlib
+import hmac
+import logging
+import os
 import secrets
+import time
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis import redis_client
 from app.models.user import User, SubscriptionTier
 
 router = APIRouter()
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Password hashing: argon2id for new hashes, legacy bcrypt hashes are still
+# accepted and upgraded on the next successful login.
+password_hasher = PasswordHasher(
+    time_cost=3,
+    memory_cost=65536,  # KiB
+    parallelism=4,
+    hash_len=32,
+    salt_len=16
+)
+
+# Dedicated pool for argon2/bcrypt work so a burst of logins cannot starve
+# the event loop's default executor used for other blocking I/O.
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash"
+)
+
+# Recently verified (password, hash) pairs. Only successful checks are
+# cached, keyed by a per-process keyed digest so plaintext never lands here.
+_verified_passwords: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_verified_passwords_key = secrets.token_bytes(32)
+
+# JWT signing key and decode settings, prepared once. Tokens missing exp or
+# sub are rejected by jwt.decode itself.
+_JWT_KEY = settings.JWT_SECRET.encode()
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"], "verify_aud": False}
+
+# Access token lifetime, in seconds and as the default expiry delta
+_TOKEN_MAX_LIFETIME = settings.JWT_EXPIRATION_HOURS * 3600
+_DEFAULT_TOKEN_TTL = timedelta(seconds=_TOKEN_MAX_LIFETIME)
+
+
+# Decoded JWT payloads keyed by a digest of the raw token, so repeat requests
+# with the same bearer token skip signature verification. Entries live until
+# the token's own exp claim, never longer than a freshly issued token.
+def _token_expiry(_key: bytes, payload: dict, now: float) -> float:
+    return min(payload.get("exp", now), now + _TOKEN_MAX_LIFETIME)
+
+
+_decoded_tokens: TLRUCache = TLRUCache(maxsize=10_000, ttu=_token_expiry, timer=time.time)
+
+# Revoked token ids live in Redis as revoked:<jti> until the token expires.
+# A negative answer is trusted for a short while so most requests skip the
+# round-trip; logouts in this process take effect immediately.
+# If Redis is unreachable the check fails open: the token's signature and
+# expiry were already verified, so an outage degrades logout to "expires at
+# exp" instead of rejecting every authenticated request. That answer is not
+# cached, so revocations apply again as soon as Redis is back.
+_REVOKED_TOKEN_PREFIX = "revoked:"
+_unrevoked_token_ids: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+# email -> user id for authenticated users; emails are immutable, so token
+# lookups can go straight to the primary key.
+_user_ids_by_email: TTLCache = TTLCache(maxsize=10_000, ttl=_TOKEN_MAX_LIFETIME)
+
+# Password reset tokens are signed and carry their own timestamp, so issuing
+# one needs no database round-trip. They also carry a fingerprint of the
+# password hash they were issued for, so a token stops working once the
+# password has changed. Changing the salt invalidates every outstanding link.
+_reset_signer = URLSafeTimedSerializer(settings.JWT_SECRET, salt="pwreset")
+_RESET_TOKEN_MAX_AGE = 3600  # seconds
+
+# Columns loaded for the authenticated user: what UserResponse exposes plus
+# the password hash for change-password. Profile extras stay deferred.
+_current_user_columns = load_only(
+    User.id,
+    User.email,
+    User.password_hash,
+    User.full_name,
+    User.company_name,
+    User.company_size,
+    User.industry,
+    User.subscription_tier,
+    User.is_active,
+    User.is_verified,
+    User.last_login,
+    User.created_at
+)
 
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -62,6 +155,8 @@ class TokenData(BaseModel):
 
 class UserResponse(BaseModel):
     """User response schema."""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: UUID
     email: str
     full_name: Optional[str]
@@ -74,9 +169,6 @@ class UserResponse(BaseModel):
     created_at: datetime
     last_login: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class UserUpdate(BaseModel):
     """User update schema."""
@@ -100,51 +192,200 @@ class PasswordReset(BaseModel):
     email: EmailStr
 
 
+class PasswordResetConfirm(BaseModel):
+    """Password reset schema."""
+    token: str
+    new_password: str = Field(..., min_length=8)
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Create JWT access token."""
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
-    
-    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    now = datetime.utcnow()
+    to_encode = {
+        **data,
+        "exp": now + (expires_delta or _DEFAULT_TOKEN_TTL),
+        "iat": now,
+        "jti": uuid4().hex
+    }
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.JWT_SECRET,
+        _JWT_KEY,
         algorithm=settings.JWT_ALGORITHM
     )
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _password_fingerprint(password_hash: str) -> str:
+    """Short digest of a password hash, identifying the current password."""
+    return hashlib.blake2b(password_hash.encode(), digest_size=16).hexdigest()
+
+
+def create_password_reset_token(user_id: UUID, password_hash: str) -> str:
+    """Issue a signed, timestamped password reset token for a user."""
+    return _reset_signer.dumps({"uid": str(user_id), "pwd": _password_fingerprint(password_hash)})
+
+
+def read_password_reset_token(token: str) -> Optional[Tuple[UUID, str]]:
+    """
+    Return the user id and password fingerprint from a reset token, or None
+    if it is invalid or expired.
+    """
+    try:
+        payload = _reset_signer.loads(token, max_age=_RESET_TOKEN_MAX_AGE)
+        return UUID(payload["uid"]), str(payload["pwd"])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+def password_reset_token_matches(fingerprint: str, password_hash: str) -> bool:
+    """Whether a reset token was issued for the user's current password."""
+    return hmac.compare_digest(fingerprint, _password_fingerprint(password_hash))
+
+
+def _password_cache_key(plain_password: str, hashed_password: str) -> bytes:
+    """Digest identifying a (password, hash) pair in the verification cache."""
+    return hashlib.blake2b(
+        f"{hashed_password}\0{plain_password}".encode(),
+        digest_size=16,
+        key=_verified_passwords_key
+    ).digest()
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Blocking password check; returns (matched, replacement hash or None)."""
+    if hashed_password.startswith("$argon2"):
+        try:
+            password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False, None
+        
+        if password_hasher.check_needs_rehash(hashed_password):
+            return True, password_hasher.hash(plain_password)
+        return True, None
+    
+    # Legacy bcrypt hash
+    try:
+        verified = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        return False, None
+    
+    if not verified:
+        return False, None
+    return True, password_hasher.hash(plain_password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify password against hash (hashing runs in the password executor).
+    
+    Returns whether the password matched and, if the stored hash uses a
+    deprecated scheme or parameters, a replacement hash to persist.
+    """
+    cache_key = _password_cache_key(plain_password, hashed_password)
+    if cache_key in _verified_passwords:
+        return True, None
+    
+    verified, new_hash = await asyncio.get_running_loop().run_in_executor(
+        _password_executor, _verify_and_update, plain_password, hashed_password
+    )
+    if not verified:
+        return False, None
+    
+    _verified_passwords[cache_key] = True
+    return True, new_hash
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    verified, _ = await verify_and_update_password(plain_password, hashed_password)
+    return verified
+
+
+def forget_verified_password(plain_password: str, hashed_password: str) -> None:
+    """Drop a cached successful verification (e.g. after a password change)."""
+    _verified_passwords.pop(_password_cache_key(plain_password, hashed_password), None)
+
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password (hashing runs in the password executor)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _password_executor, password_hasher.hash, password
+    )
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT access token, memoizing valid payloads."""
+    cache_key = _token_cache_key(token)
+    payload = _decoded_tokens.get(cache_key)
+    if payload is not None:
+        return payload
+    
+    payload = jwt.decode(
+        token,
+        _JWT_KEY,
+        algorithms=_JWT_ALGORITHMS,
+        options=_JWT_DECODE_OPTIONS
+    )
+    _decoded_tokens[cache_key] = payload
+    return payload
+
+
+async def is_token_revoked(payload: dict) -> bool:
+    """Check whether a decoded token has been revoked via logout."""
+    jti = payload.get("jti")
+    if jti is None or jti in _unrevoked_token_ids:
+        return False
+    
+    try:
+        if await redis_client.exists(f"{_REVOKED_TOKEN_PREFIX}{jti}"):
+            return True
+    except RedisError as e:
+        logger.warning("Token revocation check unavailable, failing open: %s", e)
+        return False
+    
+    _unrevoked_token_ids[jti] = True
+    return False
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+async def revoke_token(token: str, payload: dict) -> None:
+    """Revoke a token until its expiry."""
+    _decoded_tokens.pop(_token_cache_key(token), None)
+    
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    
+    _unrevoked_token_ids.pop(jti, None)
+    ttl = int(payload["exp"] - time.time())
+    if ttl > 0:
+        await redis_client.setex(f"{_REVOKED_TOKEN_PREFIX}{jti}", ttl, "1")
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str, *options) -> Optional[User]:
     """Get user by email."""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email).options(*options))
+    return result.scalar_one_or_none()
 
 
-def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
+async def get_user_by_id(db: AsyncSession, user_id: UUID, *options) -> Optional[User]:
     """Get user by ID."""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id, options=options)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user from token."""
     credentials_exception = HTTPException(
@@ -154,27 +395,26 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        user_id: str = payload.get("user_id")
-        
-        if email is None:
-            raise credentials_exception
-            
-        token_data = TokenData(email=email, user_id=user_id)
+        payload = decode_access_token(token)
+        token_data = TokenData(email=payload["sub"], user_id=payload.get("user_id"))
         
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=token_data.email)
+    if await is_token_revoked(payload):
+        raise credentials_exception
+    
+    cached_user_id = _user_ids_by_email.get(token_data.email)
+    if cached_user_id is not None:
+        user = await get_user_by_id(db, cached_user_id, _current_user_columns)
+    else:
+        user = await get_user_by_email(db, token_data.email, _current_user_columns)
     
     if user is None:
         raise credentials_exception
     
+    _user_ids_by_email[user.email] = user.id
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -204,7 +444,7 @@ async def get_current_active_user(
 async def register(
     user_data: UserRegister,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new user.
@@ -213,7 +453,7 @@ async def register(
     Returns a JWT access token upon successful registration.
     """
     # Check if user already exists
-    existing_user = get_user_by_email(db, user_data.email)
+    existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -221,7 +461,7 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     new_user = User(
         email=user_data.email,
@@ -232,14 +472,12 @@ async def register(
         industry=user_data.industry,
         subscription_tier=SubscriptionTier.TIER_1,
         is_active=True,
-        is_verified=False,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        is_verified=False
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # TODO: Send verification email in background
     # background_tasks.add_task(send_verification_email, new_user.email)
@@ -255,14 +493,14 @@ async def register(
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "expires_in": settings.JWT_EXPIRATION_HOURS * 3600
+        "expires_in": _TOKEN_MAX_LIFETIME
     }
 
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login and get access token.
@@ -271,7 +509,7 @@ async def login(
     Returns a JWT access token upon successful authentication.
     """
     # Get user
-    user = get_user_by_email(db, form_data.username)
+    user = await get_user_by_email(db, form_data.username)
     
     if not user:
         raise HTTPException(
@@ -281,7 +519,10 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(form_data.password, user.password_hash):
+    verified, new_password_hash = await verify_and_update_password(
+        form_data.password, user.password_hash
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -295,9 +536,19 @@ async def login(
             detail="User account is disabled"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (and upgrade legacy password hashes) in one
+    # statement; the loaded user object isn't read again, so skip syncing it
+    login_updates = {"last_login": func.now()}
+    if new_password_hash:
+        login_updates["password_hash"] = new_password_hash
+    
+    await db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(**login_updates)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
     
     # Create access token
     access_token = create_access_token(
@@ -310,7 +561,7 @@ async def login(
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "expires_in": settings.JWT_EXPIRATION_HOURS * 3600
+        "expires_in": _TOKEN_MAX_LIFETIME
     }
 
 
@@ -321,14 +572,14 @@ async def get_current_user_profile(
     """
     Get current authenticated user's profile.
     """
-    return current_user
+    return UserResponse.model_validate(current_user, from_attributes=True)
 
 
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's profile.
@@ -338,33 +589,32 @@ async def update_current_user(
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    current_user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     
-    return current_user
+    return UserResponse.model_validate(current_user, from_attributes=True)
 
 
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Change current user's password.
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await verify_password(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.password_hash = get_password_hash(password_data.new_password)
-    current_user.updated_at = datetime.utcnow()
-    db.commit()
+    forget_verified_password(password_data.current_password, current_user.password_hash)
+    current_user.password_hash = await get_password_hash(password_data.new_password)
+    await db.commit()
     
     return {"message": "Password changed successfully"}
 
@@ -373,7 +623,7 @@ async def change_password(
 async def forgot_password(
     reset_data: PasswordReset,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Request password reset.
@@ -381,21 +631,50 @@ async def forgot_password(
     Sends a password reset email if the user exists.
     Always returns success to prevent email enumeration.
     """
-    user = get_user_by_email(db, reset_data.email)
+    user = await get_user_by_email(db, reset_data.email)
     
     if user:
-        # Generate reset token
-        reset_token = secrets.token_urlsafe(32)
+        # Stateless signed token, redeemed at /reset-password
+        reset_token = create_password_reset_token(user.id, user.password_hash)
         
-        # TODO: Store reset token with expiry
         # TODO: Send reset email in background
         # background_tasks.add_task(send_password_reset_email, user.email, reset_token)
-        pass
     
     # Always return success to prevent email enumeration
     return {"message": "If the email exists, a password reset link has been sent"}
 
 
+@router.post("/reset-password")
+async def reset_password(
+    reset_data: PasswordResetConfirm,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Set a new password with a reset token.
+    
+    A token can be used once: setting the password changes the hash its
+    fingerprint was taken from.
+    """
+    invalid_token = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid or expired reset token"
+    )
+    
+    token_data = read_password_reset_token(reset_data.token)
+    if token_data is None:
+        raise invalid_token
+    
+    user_id, fingerprint = token_data
+    user = await get_user_by_id(db, user_id)
+    if user is None or not password_reset_token_matches(fingerprint, user.password_hash):
+        raise invalid_token
+    
+    user.password_hash = await get_password_hash(reset_data.new_password)
+    await db.commit()
+    
+    return {"message": "Password has been reset"}
+
+
 @router.post("/refresh")
 async def refresh_token(
     current_user: User = Depends(get_current_active_user)
@@ -413,17 +692,19 @@ async def refresh_token(
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "expires_in": settings.JWT_EXPIRATION_HOURS * 3600
+        "expires_in": _TOKEN_MAX_LIFETIME
     }
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_active_user)
+):
     """
     Logout user.
     
-    Note: With JWT, logout is typically handled client-side by
-    deleting the token. This endpoint is provided for consistency.
+    Revokes the presented access token until it expires.
     """
-    # TODO: Add token to blacklist if implementing token revocation
+    await revoke_token(token, decode_access_token(token))
     return {"message": "Successfully logged out"}
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Response, Depends, BackgroundTasks, status
+from fastapi import APIRouter, HTTPException, Response, Depends, status
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, computed_field
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from pathlib import Path
+import asyncio
 import os
 
 from app.core.database import get_db
@@ -13,11 +16,16 @@ from app.models.document import Document as DocumentModel, DocumentFormat, Docum
 from app.models.application import Application as ApplicationModel
 from app.models.user import User
 from app.api.v1.auth import get_current_user
-from app.tasks.application_tasks import generate_document_task
+from app.celery_app import celery_app
 from app.core.config import settings
 
 router = APIRouter()
 
+# Document file paths are stored relative to the working directory
+# (storage/documents/<application_id>/<file>); resolve the roots once.
+BASE_DIR = Path.cwd()
+DOCUMENTS_ROOT = (BASE_DIR / settings.DOCUMENTS_PATH).resolve()
+
 
 # Schemas
 class DocumentGenerate(BaseModel):
@@ -26,6 +34,8 @@ class DocumentGenerate(BaseModel):
 
 
 class DocumentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: UUID
     application_id: UUID
     document_type: DocumentType
@@ -35,19 +45,56 @@ class DocumentResponse(BaseModel):
     generated_by_ai: bool
     version: int
     created_at: datetime
-    download_url: str
     
-    class Config:
-        from_attributes = True
+    @computed_field
+    @property
+    def download_url(self) -> str:
+        """Derived at serialization time; never stored on the ORM object"""
+        return f"/api/v1/documents/{self.id}/download"
+
+
+# Helpers
+def resolve_document_path(document: DocumentModel) -> Path:
+    """Absolute path of a document's file, confined to the documents root."""
+    file_path = (BASE_DIR / document.file_path).resolve()
+    
+    if not file_path.is_relative_to(DOCUMENTS_ROOT):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    return file_path
+
+
+async def find_latest_document(
+    db: AsyncSession,
+    application_id: UUID,
+    user: User,
+    document_type: DocumentType,
+    format: DocumentFormat
+) -> Optional[DocumentModel]:
+    """Get the latest document of a type/format for one of the user's applications."""
+    result = await db.execute(
+        select(DocumentModel).join(ApplicationModel).where(
+            and_(
+                DocumentModel.application_id == application_id,
+                ApplicationModel.user_id == user.id,
+                DocumentModel.document_type == document_type,
+                DocumentModel.format == format,
+                DocumentModel.is_latest == True
+            )
+        ).limit(1)
+    )
+    return result.scalar_one_or_none()
 
 
 @router.post("/applications/{application_id}/generate", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_document(
     application_id: UUID,
     params: DocumentGenerate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generate a document for an application
@@ -55,62 +102,68 @@ async def generate_document(
     Uses AI to generate and format the document in the requested format.
     Generates asynchronously in background.
     """
+    # Hot path: the latest document already exists (ownership checked in the join)
+    existing_doc = await find_latest_document(
+        db, application_id, current_user, params.document_type, params.format
+    )
+    if existing_doc:
+        return existing_doc
+    
     # Check if application exists and belongs to user
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
+    result = await db.execute(
+        select(ApplicationModel.project_title).where(
+            and_(
+                ApplicationModel.id == application_id,
+                ApplicationModel.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    project_title = result.scalar_one_or_none()
     
-    if not application:
+    if project_title is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
     
-    # Check if document already exists
-    existing_doc = db.query(DocumentModel).filter(
-        and_(
-            DocumentModel.application_id == application_id,
-            DocumentModel.document_type == params.document_type,
-            DocumentModel.format == params.format,
-            DocumentModel.is_latest == True
-        )
-    ).first()
-    
-    if existing_doc:
-        # Return existing document
-        existing_doc.download_url = f"/api/v1/documents/{existing_doc.id}/download"
-        return existing_doc
-    
-    # Create document record
-    filename = f"antrag_{application.project_title[:30]}_{params.format.value}.{params.format.value}"
+    # Create document record; the unique "latest" index makes concurrent
+    # identical requests create a single row
+    filename = f"antrag_{project_title[:30]}_{params.format.value}.{params.format.value}"
     file_path = f"storage/documents/{application_id}/{filename}"
     
-    document = DocumentModel(
-        application_id=application_id,
-        document_type=params.document_type,
-        format=params.format,
-        filename=filename,
-        file_path=file_path,
-        generated_by_ai=True,
-        version=1
+    result = await db.execute(
+        pg_insert(DocumentModel)
+        .values(
+            application_id=application_id,
+            document_type=params.document_type,
+            format=params.format,
+            filename=filename,
+            file_path=file_path,
+            generated_by_ai=True,
+            version=1
+        )
+        .on_conflict_do_nothing(
+            index_elements=[DocumentModel.application_id, DocumentModel.document_type, DocumentModel.format],
+            index_where=(DocumentModel.is_latest == True)
+        )
+        .returning(DocumentModel)
     )
+    document = result.scalar_one_or_none()
+    await db.commit()
     
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    if document is None:
+        # Another request created it first; its generation is already queued
+        return await find_latest_document(
+            db, application_id, current_user, params.document_type, params.format
+        )
     
     # Trigger background generation
-    background_tasks.add_task(
-        generate_document_task.delay,
-        str(application_id),
-        str(document.id),
-        params.format.value
+    await asyncio.to_thread(
+        celery_app.send_task,
+        "generate_document_task",
+        args=[str(application_id), str(document.id), params.format.value]
     )
     
-    document.download_url = f"/api/v1/documents/{document.id}/download"
     return document
 
 
@@ -118,15 +171,18 @@ async def generate_document(
 async def get_document_info(
     document_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get metadata about a document"""
-    document = db.query(DocumentModel).join(ApplicationModel).filter(
-        and_(
-            DocumentModel.id == document_id,
-            ApplicationModel.user_id == current_user.id
+    result = await db.execute(
+        select(DocumentModel).join(ApplicationModel).where(
+            and_(
+                DocumentModel.id == document_id,
+                ApplicationModel.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    document = result.scalar_one_or_none()
     
     if not document:
         raise HTTPException(
@@ -134,7 +190,6 @@ async def get_document_info(
             detail="Document not found"
         )
     
-    document.download_url = f"/api/v1/documents/{document.id}/download"
     return document
 
 
@@ -142,15 +197,18 @@ async def get_document_info(
 async def download_document(
     document_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Download a generated document"""
-    document = db.query(DocumentModel).join(ApplicationModel).filter(
-        and_(
-            DocumentModel.id == document_id,
-            ApplicationModel.user_id == current_user.id
+    result = await db.execute(
+        select(DocumentModel).join(ApplicationModel).where(
+            and_(
+                DocumentModel.id == document_id,
+                ApplicationModel.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    document = result.scalar_one_or_none()
     
     if not document:
         raise HTTPException(
@@ -158,9 +216,12 @@ async def download_document(
             detail="Document not found"
         )
     
-    # Check if file exists
-    file_path = os.path.join(os.getcwd(), document.file_path)
-    if not os.path.exists(file_path):
+    # Check if file exists; the stat result is handed to FileResponse so it
+    # doesn't stat the file again to set Content-Length
+    file_path = resolve_document_path(document)
+    try:
+        stat_result = await asyncio.to_thread(os.stat, file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document file not found. It may still be generating."
@@ -173,6 +234,7 @@ async def download_document(
         path=file_path,
         media_type=media_type,
         filename=document.filename,
+        stat_result=stat_result,
         headers={"Content-Disposition": f"attachment; filename={document.filename}"}
     )
 
@@ -181,46 +243,51 @@ async def download_document(
 async def list_application_documents(
     application_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List all documents for an application"""
-    # Check if application exists and belongs to user
-    application = db.query(ApplicationModel).filter(
-        and_(
-            ApplicationModel.id == application_id,
-            ApplicationModel.user_id == current_user.id
+    # Ownership check and document fetch in one statement: the outer join
+    # yields a single (id, None) row for an owned application without
+    # documents, and no rows at all if it doesn't exist or isn't the user's.
+    result = await db.execute(
+        select(ApplicationModel.id, DocumentModel)
+        .select_from(ApplicationModel)
+        .outerjoin(DocumentModel, DocumentModel.application_id == ApplicationModel.id)
+        .where(
+            and_(
+                ApplicationModel.id == application_id,
+                ApplicationModel.user_id == current_user.id
+            )
         )
-    ).first()
+        .order_by(DocumentModel.created_at.desc())
+    )
+    rows = result.all()
     
-    if not application:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
     
-    documents = db.query(DocumentModel).filter(
-        DocumentModel.application_id == application_id
-    ).order_by(DocumentModel.created_at.desc()).all()
-    
-    for doc in documents:
-        doc.download_url = f"/api/v1/documents/{doc.id}/download"
-    
-    return documents
+    return [row.Document for row in rows if row.Document is not None]
 
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a document"""
-    document = db.query(DocumentModel).join(ApplicationModel).filter(
-        and_(
-            DocumentModel.id == document_id,
-            ApplicationModel.user_id == current_user.id
+    result = await db.execute(
+        select(DocumentModel).join(ApplicationModel).where(
+            and_(
+                DocumentModel.id == document_id,
+                ApplicationModel.user_id == current_user.id
+            )
         )
-    ).first()
+    )
+    document = result.scalar_one_or_none()
     
     if not document:
         raise HTTPException(
@@ -229,13 +296,12 @@ async def delete_document(
         )
     
     # Delete file from storage
-    file_path = os.path.join(os.getcwd(), document.file_path)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    file_path = resolve_document_path(document)
+    file_path.unlink(missing_ok=True)
     
     # Delete from database
-    db.delete(document)
-    db.commit()
+    await db.delete(document)
+    await db.commit()
     
     return None
 
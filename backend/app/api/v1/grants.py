@@ -1,64 +1,28 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from enum import Enum
-from datetime import datetime, date
-import re
+import hashlib
+from redis.exceptions import RedisError
 
-from app.services.embeddings import EmbeddingService
-from app.services.qdrant_service import QdrantService
+from app.core.redis import redis_client
+from app.services.deadlines import today_ordinal
+from app.services.embeddings import embedding_service
+from app.services.grants_shape import build_grant_detail_dict, build_grant_dict, build_listed_grant_dict
+from app.services.qdrant_service import qdrant_service
+from app.services.query_vector_cache import query_vector_cache
 
 
-def is_deadline_valid(deadline_str: Optional[str]) -> bool:
-    """
-    Check if a deadline is still valid (not expired).
-    Returns True if:
-    - deadline is None, empty, or "Laufend" (continuous)
-    - deadline date is in the future
-    Returns False if deadline has passed.
-    """
-    if not deadline_str:
-        return True
-    
-    deadline_lower = str(deadline_str).lower().strip()
-    
-    # Continuous programs are always valid
-    if deadline_lower in ['laufend', 'fortlaufend', 'keine', 'unbefristet', 'offen', '']:
-        return True
-    
-    today = date.today()
-    
-    # Try to parse various date formats
-    date_patterns = [
-        # ISO format: 2025-06-30, 2025-06-30T23:59:59Z
-        (r'(\d{4})-(\d{2})-(\d{2})', lambda m: date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
-        # German format: 30.06.2025, 1.7.2025
-        (r'(\d{1,2})\.(\d{1,2})\.(\d{4})', lambda m: date(int(m.group(3)), int(m.group(2)), int(m.group(1)))),
-        # Short German: 30.06.25
-        (r'(\d{1,2})\.(\d{1,2})\.(\d{2})$', lambda m: date(2000 + int(m.group(3)), int(m.group(2)), int(m.group(1)))),
-        # Month Year: Juni 2025, 06/2025
-        (r'(\d{1,2})/(\d{4})', lambda m: date(int(m.group(2)), int(m.group(1)), 28)),
-        # Just year: 2025, 2026
-        (r'^(\d{4})$', lambda m: date(int(m.group(1)), 12, 31)),
-    ]
-    
-    for pattern, date_converter in date_patterns:
-        match = re.search(pattern, deadline_str)
-        if match:
-            try:
-                deadline_date = date_converter(match)
-                return deadline_date >= today
-            except (ValueError, IndexError):
-                continue
-    
-    # If we can't parse the date, assume it's valid (don't exclude it)
-    return True
-
 router = APIRouter()
 
-# Initialize services
-embedding_service = EmbeddingService()
-qdrant_service = QdrantService()
+# Search parameters contributing to the embedding query, in order
+_SEARCH_QUERY_FIELDS = (
+    ('project_description', '{}'),
+    ('industry', 'Branche: {}'),
+    ('company_size', 'Unternehmensgröße: {} Mitarbeiter'),
+    ('budget', 'Budget: {} EUR'),
+    ('location', 'Standort: {}'),
+)
 
 
 # Enums
@@ -80,6 +44,8 @@ class GrantCategory(str, Enum):
 
 # Schemas
 class GrantSearch(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     company_size: Optional[int] = None
     industry: Optional[str] = None
     project_description: Optional[str] = None
@@ -88,6 +54,8 @@ class GrantSearch(BaseModel):
 
 
 class Grant(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     id: str
     name: str
     type: GrantType
@@ -107,7 +75,49 @@ class GrantDetail(Grant):
     contact: dict
 
 
-@router.post("/search", response_model=List[Grant])
+class GrantBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
+_grant_list_adapter = TypeAdapter(List[Grant])
+_grant_detail_adapter = TypeAdapter(GrantDetail)
+
+# Rendered GET responses are cached in Redis for a few minutes; grant data
+# only changes with the scheduled imports. Shared caches may keep them longer.
+_RESPONSE_CACHE_PREFIX = "grants:response:"
+_RESPONSE_CACHE_TTL = 300
+_CACHE_CONTROL = "public, max-age=300, s-maxage=600"
+
+
+async def _get_cached_response(key: str) -> Optional[bytes]:
+    """Cached response body, or None on a miss or if Redis is unavailable"""
+    try:
+        return await redis_client.get(_RESPONSE_CACHE_PREFIX + key)
+    except RedisError:
+        return None
+
+
+async def _cache_response(key: str, body: bytes):
+    """Store a response body; caching is best-effort"""
+    try:
+        await redis_client.setex(_RESPONSE_CACHE_PREFIX + key, _RESPONSE_CACHE_TTL, body)
+    except RedisError:
+        pass
+
+
+def _etag_response(request: Request, body: bytes) -> Response:
+    """JSON response with an ETag of the body, or 304 if the client has it"""
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/search", response_model=List[Grant], response_model_exclude_none=True)
 async def search_grants(search_params: GrantSearch):
     """
     AI-powered grant matching
@@ -116,127 +126,82 @@ async def search_grants(search_params: GrantSearch):
     based on company profile and project description.
     """
     # Build search query from parameters
-    query_parts = []
-    
-    if search_params.project_description:
-        query_parts.append(search_params.project_description)
-    
-    if search_params.industry:
-        query_parts.append(f"Branche: {search_params.industry}")
-    
-    if search_params.company_size:
-        query_parts.append(f"Unternehmensgröße: {search_params.company_size} Mitarbeiter")
+    query_text = " ".join(
+        template.format(value)
+        for field, template in _SEARCH_QUERY_FIELDS
+        if (value := getattr(search_params, field))
+    )
     
-    if search_params.budget:
-        query_parts.append(f"Budget: {search_params.budget} EUR")
+    if not query_text:
+        raise HTTPException(status_code=400, detail="Bitte geben Sie eine Projektbeschreibung an")
     
-    if search_params.location:
-        query_parts.append(f"Standort: {search_params.location}")
+    # Generate embedding for search query
+    query_embedding = await embedding_service.embed_query(query_text)
     
-    if not query_parts:
-        raise HTTPException(status_code=400, detail="Bitte geben Sie eine Projektbeschreibung an")
+    # Reuse results of a recent, near-identical search if there is one
+    results = query_vector_cache.get(query_embedding)
+    if results is None:
+        # Search in Qdrant - expired grants are filtered out server-side
+        results = await qdrant_service.search_similar_grants_async(
+            query_vector=query_embedding,
+            limit=10,
+            score_threshold=0.3,
+            min_deadline_ordinal=today_ordinal()
+        )
+        query_vector_cache.put(query_embedding, results)
     
-    query_text = " ".join(query_parts)
+    # Convert Qdrant results to Grant format; the deadline check still
+    # covers points imported before deadline_ordinal was stored
+    today_ord = today_ordinal()
+    grants = [
+        grant for grant in (
+            build_grant_dict(result['payload'], result['id'], result['score'], today_ord)
+            for result in results
+        )
+        if grant is not None
+    ]
     
-    # Generate embedding for search query
-    query_embedding = await embedding_service.embed_text(query_text)
+    return grants
+
+
+@router.post("/batch", response_model=List[GrantDetail])
+async def get_grant_details_batch(batch: GrantBatchRequest):
+    """
+    Get detailed information about several grants at once
     
-    # Search in Qdrant - request more results to compensate for deadline filtering
-    results = qdrant_service.search_similar_grants(
-        query_vector=query_embedding,
-        limit=30,  # Request more, filter later
-        score_threshold=0.3
-    )
+    Grants are fetched with one point lookup, plus one URL scroll for IDs
+    it misses. Results follow the order of the requested IDs; unknown IDs
+    are skipped.
+    """
+    try:
+        results = await qdrant_service.retrieve_grants_async(batch.ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching grant details: {str(e)}"
+        )
     
-    # Convert Qdrant results to Grant format
+    payloads = {result['grant_id']: result['payload'] for result in results}
     grants = []
-    for result in results:
-        # Skip if we already have 10 valid grants
-        if len(grants) >= 10:
-            break
-        payload = result['payload']
-        
-        # Extract funding amount - handle both formats
-        max_funding = 0.0
-        if 'max_funding' in payload and payload['max_funding']:
-            max_funding = float(payload['max_funding'])
-        else:
-            funding_str = payload.get('funding_amount', 'Nicht angegeben')
-            if funding_str and 'bis' in str(funding_str).lower():
-                try:
-                    numbers = re.findall(r'\d+(?:\.\d+)?', str(funding_str).replace('.', '').replace(',', '.'))
-                    if numbers:
-                        max_funding = float(numbers[-1])
-                except:
-                    pass
-        
-        # Handle both name formats: some use 'name', others use 'title'
-        grant_name = payload.get('name') or payload.get('title') or 'Unbekannt'
-        
-        # Determine type
-        grant_type = payload.get('type', 'federal')
-        if grant_type not in ['federal', 'state', 'eu', 'municipal']:
-            funder = payload.get('funder', '').lower()
-            if 'bund' in funder or 'bmw' in funder or 'bafa' in funder or 'kfw' in funder:
-                grant_type = 'federal'
-            elif any(state in funder.lower() for state in ['bayern', 'sachsen', 'nrw', 'hamburg', 'berlin', 'baden', 'hessen']):
-                grant_type = 'state'
-            else:
-                grant_type = 'state'
-        
-        # Determine category
-        grant_category = payload.get('category', 'digitalization')
-        if grant_category not in ['innovation', 'digitalization', 'green_tech', 'export', 'training', 'regional']:
-            what_funded = payload.get('what_is_funded', '').lower()
-            if 'innovation' in what_funded or 'forschung' in what_funded:
-                grant_category = 'innovation'
-            elif 'digital' in what_funded or 'it' in what_funded:
-                grant_category = 'digitalization'
-            elif 'klima' in what_funded or 'umwelt' in what_funded or 'energie' in what_funded:
-                grant_category = 'green_tech'
-            else:
-                grant_category = 'digitalization'
-        
-        # Handle deadline
-        deadline = payload.get('deadline')
-        if deadline == 'Laufend' or payload.get('is_continuous'):
-            deadline = 'Laufend'
-        
-        # Skip expired programs
-        if not is_deadline_valid(deadline):
-            continue
-        
-        grant = {
-            "id": payload.get('url') or payload.get('website_url') or payload.get('external_id') or str(result['id']),
-            "name": grant_name,
-            "type": grant_type,
-            "category": grant_category,
-            "max_funding": max_funding,
-            "deadline": deadline,
-            "description": (payload.get('description') or '')[:500],
-            "eligibility": [
-                payload.get('who_is_funded') or 'Nicht angegeben',
-                f"Fördergeber: {payload.get('funder') or 'Nicht angegeben'}",
-                f"Region: {payload.get('region') or 'Deutschland'}"
-            ],
-            "success_rate": payload.get('historical_success_rate') or 0.60,
-            "match_score": result['score']
-        }
-        grants.append(grant)
+    for grant_id in dict.fromkeys(batch.ids):  # de-duplicated, order kept
+        payload = payloads.get(grant_id)
+        if payload is not None:
+            grants.append(build_grant_detail_dict(payload, grant_id))
     
     return grants
 
 
 @router.get("/{grant_id}", response_model=GrantDetail)
-async def get_grant_detail(grant_id: str):
+async def get_grant_detail(request: Request, grant_id: str):
     """Get detailed information about a specific grant"""
-    # Try to fetch from Qdrant by ID or URL
+    cache_key = f"detail:{grant_id}"
+    body = await _get_cached_response(cache_key)
+    if body is not None:
+        return _etag_response(request, body)
+    
+    # Fetch from Qdrant by point id, falling back to the URL
     try:
-        # Search by URL (which we use as ID in many cases)
-        results = qdrant_service.search_grants_by_filter(
-            filter_conditions={"url": grant_id},
-            limit=1
-        )
+        results = await qdrant_service.retrieve_grants_async([grant_id])
         
         if not results:
             raise HTTPException(
@@ -245,35 +210,13 @@ async def get_grant_detail(grant_id: str):
             )
         
         result = results[0]
-        payload = result['payload']
         
-        # Build detailed response
-        grant_detail = {
-            "id": grant_id,
-            "name": payload.get('name') or payload.get('title') or 'Unbekannt',
-            "type": payload.get('type', 'federal'),
-            "category": payload.get('category', 'digitalization'),
-            "max_funding": float(payload.get('max_funding', 0)),
-            "deadline": payload.get('deadline', 'Laufend'),
-            "description": payload.get('description', ''),
-            "eligibility": [
-                payload.get('who_is_funded') or 'Nicht angegeben',
-                f"Fördergeber: {payload.get('funder') or 'Nicht angegeben'}",
-                f"Region: {payload.get('region') or 'Deutschland'}"
-            ],
-            "success_rate": payload.get('historical_success_rate', 0.60),
-            "requirements": payload.get('requirements', []) if isinstance(payload.get('requirements'), list) else [payload.get('requirements', 'Siehe Website')],
-            "application_process": payload.get('application_process', 'Siehe offizielle Website für Details'),
-            "duration": payload.get('duration', 'Nicht angegeben'),
-            "contact": {
-                "website": payload.get('url') or payload.get('website_url', ''),
-                "email": payload.get('contact_email', ''),
-                "phone": payload.get('contact_phone', ''),
-                "funder": payload.get('funder', 'Nicht angegeben')
-            }
-        }
+        body = _grant_detail_adapter.dump_json(
+            _grant_detail_adapter.validate_python(build_grant_detail_dict(result['payload'], grant_id))
+        )
+        await _cache_response(cache_key, body)
         
-        return grant_detail
+        return _etag_response(request, body)
         
     except Exception as e:
         raise HTTPException(
@@ -284,12 +227,24 @@ async def get_grant_detail(grant_id: str):
 
 @router.get("/", response_model=List[Grant])
 async def list_grants(
+    request: Request,
     type: Optional[GrantType] = None,
     category: Optional[GrantCategory] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, le=100)
 ):
-    """List all available grants with optional filters"""
+    """
+    List all available grants with optional filters
+    
+    Responses carry an ETag of the body; a matching If-None-Match gets an
+    empty 304 so unchanged pages aren't downloaded again. Rendered pages
+    are cached in Redis for a few minutes.
+    """
+    cache_key = f"list:{type and type.value}:{category and category.value}:{skip}:{limit}"
+    body = await _get_cached_response(cache_key)
+    if body is not None:
+        return _etag_response(request, body)
+    
     try:
         # Build filter conditions
         filter_conditions = {}
@@ -301,51 +256,26 @@ async def list_grants(
             filter_conditions['category'] = category.value
         
         # Fetch from Qdrant
-        results = qdrant_service.scroll_grants(
+        results = await qdrant_service.scroll_grants_async(
             filter_conditions=filter_conditions if filter_conditions else None,
             limit=limit,
             offset=skip
         )
         
-        # Convert to Grant format
-        grants = []
-        for result in results:
-            payload = result['payload']
-            
-            # Skip expired grants
-            deadline = payload.get('deadline', 'Laufend')
-            if not is_deadline_valid(deadline):
-                continue
-            
-            max_funding = float(payload.get('max_funding', 0))
-            if max_funding == 0:
-                funding_str = payload.get('funding_amount', '')
-                if 'bis' in str(funding_str).lower():
-                    try:
-                        numbers = re.findall(r'\d+(?:\.\d+)?', str(funding_str).replace('.', '').replace(',', '.'))
-                        if numbers:
-                            max_funding = float(numbers[-1])
-                    except:
-                        pass
-            
-            grant = {
-                "id": payload.get('url') or payload.get('external_id') or str(result['id']),
-                "name": payload.get('name') or payload.get('title') or 'Unbekannt',
-                "type": payload.get('type', 'federal'),
-                "category": payload.get('category', 'digitalization'),
-                "max_funding": max_funding,
-                "deadline": deadline,
-                "description": (payload.get('description') or '')[:500],
-                "eligibility": [
-                    payload.get('who_is_funded') or 'Nicht angegeben',
-                    f"Fördergeber: {payload.get('funder') or 'Nicht angegeben'}"
-                ],
-                "success_rate": payload.get('historical_success_rate', 0.60),
-                "match_score": None
-            }
-            grants.append(grant)
+        # Convert to Grant format, skipping expired grants
+        today_ord = today_ordinal()
+        grants = [
+            grant for grant in (
+                build_listed_grant_dict(result['payload'], result['id'], today_ord)
+                for result in results
+            )
+            if grant is not None
+        ]
+        
+        body = _grant_list_adapter.dump_json(_grant_list_adapter.validate_python(grants))
+        await _cache_response(cache_key, body)
         
-        return grants
+        return _etag_response(request, body)
         
     except Exception as e:
         raise HTTPException(
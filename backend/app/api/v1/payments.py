@@ -3,12 +3,13 @@ Payment API Routes
 Handles success fee payments and billing.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+import orjson
 
 from app.core.database import get_db
 from app.models.user import User
@@ -17,6 +18,36 @@ from app.services.stripe_service import stripe_service
 
 router = APIRouter()
 
+# Static fee structure, serialized once at import
+_FEE_TIERS_JSON = orjson.dumps({
+    "tiers": [
+        {
+            "tier": "tier_1",
+            "name": "Basic / Success-Fee",
+            "fee_percentage": 25,
+            "monthly_fee": 0,
+            "description": "Keine monatlichen Kosten. 25% Success-Fee bei Bewilligung."
+        },
+        {
+            "tier": "tier_2",
+            "name": "Hybrid",
+            "fee_percentage": 20,
+            "monthly_fee": 199,
+            "description": "199€/Monat + reduzierte 20% Success-Fee."
+        },
+        {
+            "tier": "tier_3",
+            "name": "Enterprise",
+            "fee_percentage": 15,
+            "monthly_fee": 499,
+            "description": "499€/Monat + nur 15% Success-Fee. Priority Support."
+        }
+    ],
+    "min_fee": 500,
+    "max_fee": 50000,
+    "currency": "EUR"
+})
+
 
 # =============================================================================
 # Schemas
@@ -118,7 +149,7 @@ async def calculate_success_fee(
 async def create_payment(
     request: CreatePaymentRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a payment intent for success fee.
@@ -171,7 +202,7 @@ async def create_payment(
 async def create_invoice(
     request: CreateInvoiceRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create an invoice for success fee.
@@ -282,31 +313,8 @@ async def get_fee_tiers():
     
     Returns the fee structure for different subscription levels.
     """
-    return {
-        "tiers": [
-            {
-                "tier": "tier_1",
-                "name": "Basic / Success-Fee",
-                "fee_percentage": 25,
-                "monthly_fee": 0,
-                "description": "Keine monatlichen Kosten. 25% Success-Fee bei Bewilligung."
-            },
-            {
-                "tier": "tier_2",
-                "name": "Hybrid",
-                "fee_percentage": 20,
-                "monthly_fee": 199,
-                "description": "199€/Monat + reduzierte 20% Success-Fee."
-            },
-            {
-                "tier": "tier_3",
-                "name": "Enterprise",
-                "fee_percentage": 15,
-                "monthly_fee": 499,
-                "description": "499€/Monat + nur 15% Success-Fee. Priority Support."
-            }
-        ],
-        "min_fee": 500,
-        "max_fee": 50000,
-        "currency": "EUR"
-    }
+    return Response(
+        content=_FEE_TIERS_JSON,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
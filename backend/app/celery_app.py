@@ -2,6 +2,7 @@
 Celery application configuration
 """
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 # Create Celery app
@@ -14,33 +15,40 @@ celery_app = Celery(
 
 # Celery configuration
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # msgpack + zstd keeps scraper payloads and results small in Redis;
+    # json stays accepted for messages queued before the switch
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    task_compression="zstd",
+    result_compression="zstd",
     timezone="Europe/Berlin",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max
     task_soft_time_limit=3000,  # 50 minutes soft limit
+    # Scraper tasks run for minutes; reserve one at a time so a busy worker
+    # process doesn't hold queued work that idle processes could take
+    worker_prefetch_multiplier=1,
     
     # Beat schedule for automated scraping
     beat_schedule={
         # Tier-1 scrapers: Run daily at 2:00 AM
         'run-tier1-scrapers-daily': {
             'task': 'run_tier1_scrapers',
-            'schedule': 60 * 60 * 24,  # Every 24 hours
+            'schedule': crontab(hour=2, minute=0),
             'options': {'queue': 'scraping'}
         },
         # Tier-2 scrapers: Run weekly on Sunday at 3:00 AM
         'run-tier2-scrapers-weekly': {
             'task': 'run_tier2_scrapers',
-            'schedule': 60 * 60 * 24 * 7,  # Every 7 days
+            'schedule': crontab(hour=3, minute=0, day_of_week='sun'),
             'options': {'queue': 'scraping'}
         },
         # Update embeddings: Run daily at 4:00 AM (after scrapers)
         'update-embeddings-daily': {
             'task': 'update_embeddings',
-            'schedule': 60 * 60 * 24,  # Every 24 hours
+            'schedule': crontab(hour=4, minute=0),
             'options': {'queue': 'embeddings'}
         },
     },
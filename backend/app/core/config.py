@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pool per API worker
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 300
+    # Create missing tables on startup (dev only); deployments run Alembic
+    AUTO_CREATE_TABLES: bool = False
     
     # Redis
     REDIS_HOST: str = "redis"
@@ -27,6 +33,8 @@ class Settings(BaseSettings):
     QDRANT_HOST: str = "qdrant"
     QDRANT_PORT: int = 6333
     QDRANT_COLLECTION: str = "grants"
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False
     
     # OpenAI
     OPENAI_API_KEY: str
@@ -6,7 +6,16 @@ from app.core.config import settings
 engine = create_async_engine(
     settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    # AsyncAdaptedQueuePool is the async default; size it for concurrent
+    # requests and check connections on checkout so dropped ones are replaced
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # Room for every distinct select() the API issues, so per-request lookups
+    # reuse their compiled SQL instead of re-rendering it
+    query_cache_size=1200
 )
 
 # Create async session maker
@@ -27,4 +36,3 @@ async def get_db():
             yield session
         finally:
             await session.close()
-
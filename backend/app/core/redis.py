@@ -0,0 +1,21 @@
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+
+def create_redis_client() -> Redis:
+    """
+    Async Redis client for application keys.
+    
+    DB 0 belongs to the Celery broker/backend, so app keys live in DB 1.
+    """
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD or None,
+        db=1
+    )
+
+
+# Shared client for request-path lookups (token revocation, response cache)
+redis_client = create_redis_client()
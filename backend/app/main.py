@@ -1,12 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
+from brotli_asgi import BrotliMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api.v1 import auth, grants, applications, documents, users, payments
+from app.services.application_writer import application_writer
+from app.services.openrouter_client import openrouter_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,16 +22,19 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting GrantGPT API...")
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    logger.info("Database tables created successfully")
+    # Schema is managed by Alembic; create_all is only a dev shortcut
+    if settings.AUTO_CREATE_TABLES:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        logger.info("Database tables created successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down GrantGPT API...")
+    await application_writer.aclose()
+    await openrouter_client.aclose()
 
 
 # Initialize FastAPI app
@@ -39,19 +45,24 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With", "If-None-Match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+    # Let browsers reuse a preflight result for a day
+    max_age=86400,
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Brotli for clients that accept br, gzip fallback for the rest
+app.add_middleware(BrotliMiddleware, quality=4, minimum_size=1000, gzip_fallback=True)
 
 # API Routes
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
@@ -88,6 +99,8 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8008,
+        loop="uvloop",
+        http="httptools",
         reload=True
     )
 
@@ -1,7 +1,6 @@
-from sqlalchemy import Column, String, Float, DateTime, Text, JSON, Enum as SQLEnum, ForeignKey, Integer, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Float, DateTime, Text, Enum as SQLEnum, ForeignKey, Integer, Boolean, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 
@@ -27,13 +26,18 @@ class Application(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Foreign Keys
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     grant_external_id = Column(String, nullable=False, index=True)  # Reference to grant
     
+    # Grant snapshot taken at creation, so list views need no grant lookups
+    grant_name = Column(String, nullable=True)
+    grant_type = Column(String, nullable=True)
+    grant_max_funding = Column(Float, nullable=True)
+    
     # Project Info
     project_title = Column(String, nullable=False)
     project_description = Column(Text, nullable=False)
-    project_goals = Column(JSON, nullable=True)  # List of goals
+    project_goals = Column(JSONB, nullable=True)  # List of goals
     project_innovation = Column(Text, nullable=True)
     project_technology = Column(Text, nullable=True)
     timeline_months = Column(Integer, nullable=False)
@@ -42,10 +46,10 @@ class Application(Base):
     total_budget = Column(Float, nullable=False)
     requested_funding = Column(Float, nullable=False)
     own_contribution = Column(Float, nullable=False)
-    budget_breakdown = Column(JSON, nullable=True)  # Detailed breakdown
+    budget_breakdown = Column(JSONB, nullable=True)  # Detailed breakdown
     
     # Team
-    team_info = Column(JSON, nullable=True)
+    team_info = Column(JSONB, nullable=True)
     
     # Market
     target_audience = Column(Text, nullable=True)
@@ -53,18 +57,17 @@ class Application(Base):
     business_model = Column(Text, nullable=True)
     
     # Generated Content (AI-written sections)
-    generated_content = Column(JSON, nullable=True)  # {section_name: content}
+    generated_content = Column(JSONB, nullable=True)  # {section_name: content}, plus "<section_name>:partial" while streaming
     
     # Compliance
     compliance_score = Column(Float, nullable=True)  # 0-100
-    compliance_checks = Column(JSON, nullable=True)  # Detailed check results
+    compliance_checks = Column(JSONB, nullable=True)  # Detailed check results
     
     # Status
     status = Column(
         SQLEnum(ApplicationStatus),
         default=ApplicationStatus.DRAFT,
-        nullable=False,
-        index=True
+        nullable=False
     )
     completion_percentage = Column(Integer, default=0, nullable=False)
     
@@ -84,12 +87,21 @@ class Application(Base):
     commission_paid_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="applications")
-    documents = relationship("Document", back_populates="application", cascade="all, delete-orphan")
+    # Collections are never loaded implicitly (a lazy load under asyncio
+    # fails); callers opt in with selectinload(Application.documents)
+    documents = relationship("Document", back_populates="application", cascade="all, delete-orphan", lazy="raise")
+    
+    __table_args__ = (
+        # Serve list_applications newest first, filtered by user and status
+        # or by user alone
+        Index("ix_applications_user_status_created", user_id, status, created_at.desc(), id.desc()),
+        Index("ix_applications_user_created", user_id, created_at.desc(), id.desc()),
+    )
     
     def __repr__(self):
         return f"<Application {self.project_title} ({self.status.value})>"
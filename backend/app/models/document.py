@@ -1,7 +1,6 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 
@@ -35,7 +34,7 @@ class Document(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Foreign Key
-    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=False, index=True)
+    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=False)
     
     # Document Info
     document_type = Column(SQLEnum(DocumentType), nullable=False)
@@ -55,11 +54,24 @@ class Document(Base):
     is_latest = Column(Boolean, default=True, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
     # Relationships
     application = relationship("Application", back_populates="documents")
     
+    __table_args__ = (
+        # One latest document per type/format; serves generate_document's
+        # lookup and its ON CONFLICT DO NOTHING insert
+        Index(
+            "ix_documents_app_type_fmt_latest",
+            application_id, document_type, format,
+            unique=True,
+            postgresql_where=(is_latest == True)
+        ),
+        # Serves list_application_documents (newest first)
+        Index("ix_documents_application_id_created_at", application_id, created_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<Document {self.filename} ({self.document_type.value})>"
 
@@ -1,6 +1,5 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Boolean, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, Boolean, Enum as SQLEnum, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 import enum
 
@@ -46,8 +45,8 @@ class Grant(Base):
     guidelines = Column(Text, nullable=True)  # Detailed guidelines
     
     # Eligibility
-    eligibility = Column(JSON, nullable=True)  # List of requirements
-    requirements = Column(JSON, nullable=True)  # Detailed requirements
+    eligibility = Column(JSONB, nullable=True)  # List of requirements
+    requirements = Column(JSONB, nullable=True)  # Detailed requirements
     
     # Process
     application_process = Column(Text, nullable=True)
@@ -62,15 +61,15 @@ class Grant(Base):
     avg_funded_amount = Column(Float, nullable=True)
     
     # Contact
-    contact_info = Column(JSON, nullable=True)
+    contact_info = Column(JSONB, nullable=True)
     website_url = Column(String, nullable=True)
     
     # Vector embedding (stored as JSON for compatibility)
-    embedding_metadata = Column(JSON, nullable=True)  # Store model info
+    embedding_metadata = Column(JSONB, nullable=True)  # Store model info
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
     def __repr__(self):
         return f"<Grant {self.name} ({self.external_id})>"
@@ -1,7 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Enum as SQLEnum, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 
@@ -43,12 +42,13 @@ class User(Base):
     is_verified = Column(Boolean, default=False, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     last_login = Column(DateTime, nullable=True)
     
     # Relationships
-    applications = relationship("Application", back_populates="user", cascade="all, delete-orphan")
+    # Never loaded implicitly; opt in with selectinload(User.applications)
+    applications = relationship("Application", back_populates="user", cascade="all, delete-orphan", lazy="raise")
     
     def __repr__(self):
         return f"<User {self.email}>"
@@ -1,11 +1,253 @@
 """
 Application Writer Service - AI-powered grant application generation
 """
-from typing import Dict, Any, List
+from typing import AsyncIterator, Callable, Dict, Any, List, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from app.core.config import settings
+from app.core.redis import create_redis_client
 from app.services.openrouter_client import openrouter_client
 
 
+_BASE_SYSTEM_PROMPT = """Du bist ein erfahrener Fördermittel-Berater mit 20 Jahren Erfahrung.
+Deine Aufgabe: Schreibe überzeugende, professionelle Antragsabschnitte.
+
+Wichtig:
+- Wissenschaftlich und sachlich (keine Marketing-Sprache!)
+- Konkrete Zahlen und Fakten
+- Betone Innovation und technisches Risiko
+- Referenziere relevante Studien/Technologien
+- Deutsche Sprache, professionell
+"""
+
+_SECTION_FOCUS = {
+    "project_description": "Fokus: Problemstellung, Innovation, Alleinstellungsmerkmal",
+    "market_analysis": "Fokus: TAM/SAM/SOM, Wettbewerb, Marktpotenzial",
+    "technical_feasibility": "Fokus: Technologie, Architektur, Risiken",
+    "work_plan": "Fokus: Meilensteine, Aufgaben, Timeline",
+    "financial_plan": "Fokus: Kosten, Finanzierung, Break-Even",
+    "risk_management": "Fokus: Risiken identifizieren und mitigieren",
+    "utilization_plan": "Fokus: Verwertung, Go-to-Market, Skalierung"
+}
+
+# Complete system prompt per section, built once at import
+_SYSTEM_PROMPTS: Dict[str, str] = {
+    section_type: _BASE_SYSTEM_PROMPT + "\n" + focus
+    for section_type, focus in _SECTION_FOCUS.items()
+}
+
+# User prompt templates, parsed once and filled with str.format_map
+_PROJECT_DESCRIPTION_PROMPT = """
+Schreibe die Projektbeschreibung für folgendes Projekt:
+
+Titel: {title}
+Beschreibung: {description}
+Innovation: {innovation}
+Technologie: {technology}
+Ziele: {goals}
+
+Struktur:
+1. Ausgangssituation & Problemstellung (1 Seite)
+2. Projektziel & angestrebte Lösung (1,5 Seiten)
+3. Innovation & Alleinstellungsmerkmal (1,5 Seiten)
+4. Nutzen für Zielgruppe & Marktpotenzial (1 Seite)
+
+Richtlinien: {guidelines}
+"""
+
+_MARKET_ANALYSIS_PROMPT = """
+Erstelle eine Marktanalyse für folgendes Projekt:
+
+Projekt: {title}
+Beschreibung: {description}
+Zielgruppe: {target_audience}
+Markt: {market_analysis}
+
+Struktur:
+1. TAM/SAM/SOM-Analyse (Total/Serviceable/Obtainable Market)
+2. Wettbewerber-Analyse
+3. Marktpotenzial und Trends
+4. Marktposition nach Projekt
+
+Richtlinien: {guidelines}
+"""
+
+_TECHNICAL_FEASIBILITY_PROMPT = """
+Erstelle eine technische Machbarkeitsanalyse:
+
+Projekt: {title}
+Technologie: {technology}
+Innovation: {innovation}
+
+Struktur:
+1. Technologie-Stack und Architektur
+2. Entwicklungs-Roadmap
+3. Technische Risiken und Mitigation
+4. Innovationsgrad (wichtig!)
+
+Richtlinien: {guidelines}
+"""
+
+_WORK_PLAN_PROMPT = """
+Erstelle einen detaillierten Arbeitsplan:
+
+Projekt: {title}
+Dauer: {timeline_months} Monate
+Beschreibung: {description}
+
+Struktur:
+1. Meilensteine (M1-M{milestones})
+2. Aufgaben pro Meilenstein
+3. Ressourcenplanung
+4. Gantt-Chart (textbasiert)
+
+Richtlinien: {guidelines}
+"""
+
+_FINANCIAL_PLAN_PROMPT = """
+Erstelle einen Finanzplan:
+
+Gesamtbudget: {total_budget:,.2f} €
+Fördersumme: {requested_funding:,.2f} €
+Eigenanteil: {own_contribution:,.2f} €
+Budget-Breakdown: {breakdown}
+
+Struktur:
+1. Kostenplan (detailliert)
+2. Finanzierungsplan
+3. Break-Even-Analyse
+4. Liquiditäts-Planung
+
+Richtlinien: {guidelines}
+"""
+
+_RISK_MANAGEMENT_PROMPT = """
+Erstelle ein Risikomanagement:
+
+Projekt: {title}
+Technologie: {technology}
+Markt: {market_analysis}
+
+Struktur:
+1. Technische Risiken und Mitigation
+2. Marktrisiken und Mitigation
+3. Finanzielle Risiken und Mitigation
+4. Ressourcen-Risiken und Mitigation
+
+Richtlinien: {guidelines}
+"""
+
+_UTILIZATION_PLAN_PROMPT = """
+Erstelle einen Verwertungsplan:
+
+Projekt: {title}
+Beschreibung: {description}
+Business-Model: {business_model}
+Zielgruppe: {target_audience}
+
+Struktur:
+1. Go-to-Market-Strategie
+2. Pricing und Erlösmodell
+3. Skalierungs-Plan
+4. Langfristige Vision
+
+Richtlinien: {guidelines}
+"""
+
+# Completions are reused for identical prompts (shared boilerplate,
+# repeated grant guidelines) unless sampling is too random to repeat
+_COMPLETION_CACHE_PREFIX = "completion:"
+_COMPLETION_CACHE_TTL = 7 * 24 * 3600
+_COMPLETION_CACHE_MAX_TEMPERATURE = 0.9
+
+
+class SectionSpec(NamedTuple):
+    """Prompts for one application section"""
+    system_prompt: str
+    user_template: str
+    # Fallbacks for this section only, applied before the shared ones
+    defaults: Dict[str, Any]
+
+
+# Dispatch table for generate_section, in document order
+_SECTION_SPECS: Dict[str, SectionSpec] = {
+    "project_description": SectionSpec(
+        _SYSTEM_PROMPTS["project_description"], _PROJECT_DESCRIPTION_PROMPT, {"title": "Unbekannt"}
+    ),
+    "market_analysis": SectionSpec(
+        _SYSTEM_PROMPTS["market_analysis"], _MARKET_ANALYSIS_PROMPT, {"title": "Unbekannt"}
+    ),
+    "technical_feasibility": SectionSpec(
+        _SYSTEM_PROMPTS["technical_feasibility"], _TECHNICAL_FEASIBILITY_PROMPT, {}
+    ),
+    "work_plan": SectionSpec(_SYSTEM_PROMPTS["work_plan"], _WORK_PLAN_PROMPT, {}),
+    "financial_plan": SectionSpec(_SYSTEM_PROMPTS["financial_plan"], _FINANCIAL_PLAN_PROMPT, {}),
+    "risk_management": SectionSpec(_SYSTEM_PROMPTS["risk_management"], _RISK_MANAGEMENT_PROMPT, {}),
+    "utilization_plan": SectionSpec(_SYSTEM_PROMPTS["utilization_plan"], _UTILIZATION_PLAN_PROMPT, {})
+}
+
+# Sections of a complete application, in document order
+SECTION_TYPES = tuple(_SECTION_SPECS)
+
+# Fallbacks for every field the templates reference
+_FIELD_DEFAULTS: Dict[str, Any] = {
+    "title": "",
+    "description": "",
+    "innovation": "",
+    "technology": "",
+    "goals": "",
+    "target_audience": "",
+    "market_analysis": "",
+    "business_model": "",
+    "timeline_months": 0,
+    "milestones": 0,
+    "total_budget": 0,
+    "requested_funding": 0,
+    "own_contribution": 0,
+    "breakdown": {}
+}
+
+
+def build_section_context(
+    project_info: Dict[str, Any],
+    grant_guidelines: str,
+    budget_info: Dict[str, Any] = None,
+    timeline_months: int = None
+) -> Dict[str, Any]:
+    """Template fields shared by all sections, computed once per application"""
+    context = {**project_info, **(budget_info or {}), "guidelines": grant_guidelines}
+    if "goals" in project_info:
+        context["goals"] = ', '.join(project_info["goals"])
+    if timeline_months is not None:
+        context["timeline_months"] = timeline_months
+        context["milestones"] = min(timeline_months // 3, 6)
+    return context
+
+
+def build_generation_inputs(application: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Project and budget info for an Application row"""
+    project_info = {
+        "title": application.project_title,
+        "description": application.project_description,
+        "goals": application.project_goals or [],
+        "innovation": application.project_innovation or "",
+        "timeline_months": application.timeline_months,
+        "total_budget": application.total_budget,
+        "requested_funding": application.requested_funding,
+        "target_audience": application.target_audience or "",
+        "market_analysis": application.market_analysis or ""
+    }
+    budget_info = {
+        "total_budget": application.total_budget,
+        "requested_funding": application.requested_funding,
+        "own_contribution": application.own_contribution,
+        "breakdown": application.budget_breakdown or {}
+    }
+    return project_info, budget_info
+
+
 class ApplicationWriter:
     """Service for generating grant application content using OpenRouter"""
     
@@ -13,6 +255,120 @@ class ApplicationWriter:
         self.client = openrouter_client
         self.temperature = 0.7
         self.max_tokens = 4000
+        # Max concurrent non-streaming OpenRouter calls; the semaphore is rebuilt
+        # when the event loop changes (Celery tasks run each asyncio.run on a fresh loop)
+        self.max_concurrency = 4
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Completion cache client, bound to the event loop like the semaphore;
+        # aclose() releases it before the loop ends (see app.tasks.run_async)
+        self._cache: Optional[Redis] = None
+        self._cache_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def generate_full_application(
+        self,
+        project_info: Dict[str, Any],
+        budget_info: Dict[str, Any],
+        timeline_months: int,
+        grant_guidelines: str,
+        rag_examples: List[str] = None,
+        use_cache: bool = True,
+        on_section_done: Optional[Callable[[str, int], None]] = None
+    ) -> Dict[str, str]:
+        """
+        Generate all application sections concurrently
+        
+        Args:
+            project_info: Project details from user
+            budget_info: Budget figures for the financial plan
+            timeline_months: Project duration for the work plan
+            grant_guidelines: Specific grant guidelines
+            rag_examples: Similar successful applications
+            use_cache: Reuse cached completions; False forces new text
+            on_section_done: Called with the section name and the number of
+                finished sections as each one completes
+            
+        Returns:
+            Generated text per section name
+        """
+        context = build_section_context(project_info, grant_guidelines, budget_info, timeline_months)
+        sections: Dict[str, str] = {}
+        first_error: Optional[BaseException] = None
+        
+        for next_section in asyncio.as_completed([
+            self._generate_named_section(
+                section_type,
+                context,
+                rag_examples if section_type == "project_description" else None,
+                use_cache
+            )
+            for section_type in SECTION_TYPES
+        ]):
+            # Let every section finish, then fail the whole application on the first error
+            try:
+                section_type, content = await next_section
+            except Exception as e:
+                first_error = first_error or e
+                continue
+            
+            sections[section_type] = content
+            if on_section_done is not None:
+                on_section_done(section_type, len(sections))
+        
+        if first_error is not None:
+            raise first_error
+        
+        return {section_type: sections[section_type] for section_type in SECTION_TYPES}
+    
+    async def _generate_named_section(self, section_type: str, *args) -> Tuple[str, str]:
+        """generate_section result paired with its name, for as_completed"""
+        return section_type, await self.generate_section(section_type, *args)
+    
+    async def generate_section(
+        self,
+        section_type: str,
+        context: Dict[str, Any],
+        rag_examples: List[str] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Generate one section
+        
+        Args:
+            section_type: One of SECTION_TYPES
+            context: Template fields from build_section_context
+            rag_examples: Similar successful applications to reference
+            use_cache: Reuse a cached completion; False forces new text
+            
+        Returns:
+            Generated section text
+        """
+        system_prompt, user_prompt = self._build_prompts(section_type, context, rag_examples)
+        return await self._generate_content(system_prompt, user_prompt, use_cache)
+    
+    async def generate_section_stream(
+        self,
+        section_type: str,
+        context: Dict[str, Any],
+        rag_examples: List[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate one section, yielding text as the model writes it
+        
+        Always produces new text; the result is stored in the completion
+        cache once complete.
+        
+        Args:
+            section_type: One of SECTION_TYPES
+            context: Template fields from build_section_context
+            rag_examples: Similar successful applications to reference
+            
+        Yields:
+            Generated text chunks
+        """
+        system_prompt, user_prompt = self._build_prompts(section_type, context, rag_examples)
+        async for chunk in self._generate_content_stream(system_prompt, user_prompt):
+            yield chunk
     
     async def generate_project_description(
         self,
@@ -31,14 +387,11 @@ class ApplicationWriter:
         Returns:
             Generated project description text
         """
-        system_prompt = self._build_system_prompt("project_description")
-        user_prompt = self._build_project_description_prompt(
-            project_info,
-            grant_guidelines,
+        return await self.generate_section(
+            "project_description",
+            build_section_context(project_info, grant_guidelines),
             rag_examples
         )
-        
-        return await self._generate_content(system_prompt, user_prompt)
     
     async def generate_market_analysis(
         self,
@@ -46,24 +399,7 @@ class ApplicationWriter:
         grant_guidelines: str
     ) -> str:
         """Generate market analysis section (2-3 pages)"""
-        system_prompt = self._build_system_prompt("market_analysis")
-        user_prompt = f"""
-Erstelle eine Marktanalyse für folgendes Projekt:
-
-Projekt: {project_info.get('title', 'Unbekannt')}
-Beschreibung: {project_info.get('description', '')}
-Zielgruppe: {project_info.get('target_audience', '')}
-Markt: {project_info.get('market_analysis', '')}
-
-Struktur:
-1. TAM/SAM/SOM-Analyse (Total/Serviceable/Obtainable Market)
-2. Wettbewerber-Analyse
-3. Marktpotenzial und Trends
-4. Marktposition nach Projekt
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section("market_analysis", build_section_context(project_info, grant_guidelines))
     
     async def generate_technical_feasibility(
         self,
@@ -71,23 +407,7 @@ Richtlinien: {grant_guidelines}
         grant_guidelines: str
     ) -> str:
         """Generate technical feasibility section (3-4 pages)"""
-        system_prompt = self._build_system_prompt("technical_feasibility")
-        user_prompt = f"""
-Erstelle eine technische Machbarkeitsanalyse:
-
-Projekt: {project_info.get('title', '')}
-Technologie: {project_info.get('technology', '')}
-Innovation: {project_info.get('innovation', '')}
-
-Struktur:
-1. Technologie-Stack und Architektur
-2. Entwicklungs-Roadmap
-3. Technische Risiken und Mitigation
-4. Innovationsgrad (wichtig!)
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section("technical_feasibility", build_section_context(project_info, grant_guidelines))
     
     async def generate_work_plan(
         self,
@@ -96,23 +416,10 @@ Richtlinien: {grant_guidelines}
         grant_guidelines: str
     ) -> str:
         """Generate work plan section (2-3 pages)"""
-        system_prompt = self._build_system_prompt("work_plan")
-        user_prompt = f"""
-Erstelle einen detaillierten Arbeitsplan:
-
-Projekt: {project_info.get('title', '')}
-Dauer: {timeline_months} Monate
-Beschreibung: {project_info.get('description', '')}
-
-Struktur:
-1. Meilensteine (M1-M{min(timeline_months // 3, 6)})
-2. Aufgaben pro Meilenstein
-3. Ressourcenplanung
-4. Gantt-Chart (textbasiert)
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section(
+            "work_plan",
+            build_section_context(project_info, grant_guidelines, timeline_months=timeline_months)
+        )
     
     async def generate_financial_plan(
         self,
@@ -120,24 +427,7 @@ Richtlinien: {grant_guidelines}
         grant_guidelines: str
     ) -> str:
         """Generate financial plan section (2 pages)"""
-        system_prompt = self._build_system_prompt("financial_plan")
-        user_prompt = f"""
-Erstelle einen Finanzplan:
-
-Gesamtbudget: {budget_info.get('total_budget', 0):,.2f} €
-Fördersumme: {budget_info.get('requested_funding', 0):,.2f} €
-Eigenanteil: {budget_info.get('own_contribution', 0):,.2f} €
-Budget-Breakdown: {budget_info.get('breakdown', {})}
-
-Struktur:
-1. Kostenplan (detailliert)
-2. Finanzierungsplan
-3. Break-Even-Analyse
-4. Liquiditäts-Planung
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section("financial_plan", build_section_context({}, grant_guidelines, budget_info))
     
     async def generate_risk_management(
         self,
@@ -145,23 +435,7 @@ Richtlinien: {grant_guidelines}
         grant_guidelines: str
     ) -> str:
         """Generate risk management section (1-2 pages)"""
-        system_prompt = self._build_system_prompt("risk_management")
-        user_prompt = f"""
-Erstelle ein Risikomanagement:
-
-Projekt: {project_info.get('title', '')}
-Technologie: {project_info.get('technology', '')}
-Markt: {project_info.get('market_analysis', '')}
-
-Struktur:
-1. Technische Risiken und Mitigation
-2. Marktrisiken und Mitigation
-3. Finanzielle Risiken und Mitigation
-4. Ressourcen-Risiken und Mitigation
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section("risk_management", build_section_context(project_info, grant_guidelines))
     
     async def generate_utilization_plan(
         self,
@@ -169,85 +443,78 @@ Richtlinien: {grant_guidelines}
         grant_guidelines: str
     ) -> str:
         """Generate utilization plan section (2-3 pages)"""
-        system_prompt = self._build_system_prompt("utilization_plan")
-        user_prompt = f"""
-Erstelle einen Verwertungsplan:
-
-Projekt: {project_info.get('title', '')}
-Beschreibung: {project_info.get('description', '')}
-Business-Model: {project_info.get('business_model', '')}
-Zielgruppe: {project_info.get('target_audience', '')}
-
-Struktur:
-1. Go-to-Market-Strategie
-2. Pricing und Erlösmodell
-3. Skalierungs-Plan
-4. Langfristige Vision
-
-Richtlinien: {grant_guidelines}
-"""
-        return await self._generate_content(system_prompt, user_prompt)
+        return await self.generate_section("utilization_plan", build_section_context(project_info, grant_guidelines))
     
-    def _build_system_prompt(self, section_type: str) -> str:
-        """Build system prompt for specific section"""
-        base = """Du bist ein erfahrener Fördermittel-Berater mit 20 Jahren Erfahrung.
-Deine Aufgabe: Schreibe überzeugende, professionelle Antragsabschnitte.
-
-Wichtig:
-- Wissenschaftlich und sachlich (keine Marketing-Sprache!)
-- Konkrete Zahlen und Fakten
-- Betone Innovation und technisches Risiko
-- Referenziere relevante Studien/Technologien
-- Deutsche Sprache, professionell
-"""
-        
-        section_specific = {
-            "project_description": "Fokus: Problemstellung, Innovation, Alleinstellungsmerkmal",
-            "market_analysis": "Fokus: TAM/SAM/SOM, Wettbewerb, Marktpotenzial",
-            "technical_feasibility": "Fokus: Technologie, Architektur, Risiken",
-            "work_plan": "Fokus: Meilensteine, Aufgaben, Timeline",
-            "financial_plan": "Fokus: Kosten, Finanzierung, Break-Even",
-            "risk_management": "Fokus: Risiken identifizieren und mitigieren",
-            "utilization_plan": "Fokus: Verwertung, Go-to-Market, Skalierung"
-        }
-        
-        return base + "\n" + section_specific.get(section_type, "")
-    
-    def _build_project_description_prompt(
+    def _build_prompts(
         self,
-        project_info: Dict[str, Any],
-        grant_guidelines: str,
+        section_type: str,
+        context: Dict[str, Any],
         rag_examples: List[str] = None
-    ) -> str:
-        """Build detailed prompt for project description"""
-        prompt = f"""
-Schreibe die Projektbeschreibung für folgendes Projekt:
-
-Titel: {project_info.get('title', 'Unbekannt')}
-Beschreibung: {project_info.get('description', '')}
-Innovation: {project_info.get('innovation', '')}
-Technologie: {project_info.get('technology', '')}
-Ziele: {', '.join(project_info.get('goals', []))}
-
-Struktur:
-1. Ausgangssituation & Problemstellung (1 Seite)
-2. Projektziel & angestrebte Lösung (1,5 Seiten)
-3. Innovation & Alleinstellungsmerkmal (1,5 Seiten)
-4. Nutzen für Zielgruppe & Marktpotenzial (1 Seite)
-
-Richtlinien: {grant_guidelines}
-"""
+    ) -> Tuple[str, str]:
+        """System and user prompt for a section"""
+        spec = _SECTION_SPECS[section_type]
+        user_prompt = spec.user_template.format_map({**_FIELD_DEFAULTS, **spec.defaults, **context})
         
         if rag_examples:
-            prompt += "\n\nReferenz (erfolgreiche Anträge):\n"
-            prompt += "\n---\n".join(rag_examples[:2])  # Max 2 examples
+            user_prompt += "\n\nReferenz (erfolgreiche Anträge):\n"
+            user_prompt += "\n---\n".join(rag_examples[:2])  # Max 2 examples
         
-        return prompt
+        return spec.system_prompt, user_prompt
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for OpenRouter calls on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    def _get_cache(self) -> Redis:
+        """Completion cache client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._cache is None or self._cache_loop is not loop:
+            self._cache = create_redis_client()
+            self._cache_loop = loop
+        return self._cache
+    
+    async def aclose(self):
+        """Close the loop-bound completion cache client"""
+        if self._cache is not None:
+            await self._cache.aclose()
+        self._cache = None
+        self._cache_loop = None
+        self._semaphore = None
+        self._semaphore_loop = None
+    
+    def _completion_cache_key(self, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """Cache key for a prompt pair, or None if the completion shouldn't be cached"""
+        if self.temperature > _COMPLETION_CACHE_MAX_TEMPERATURE:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.client.chat_model, str(self.temperature), str(self.max_tokens), system_prompt, user_prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return _COMPLETION_CACHE_PREFIX + digest.hexdigest()
+    
+    async def _get_cached_completion(self, key: str) -> Optional[str]:
+        try:
+            cached = await self._get_cache().get(key)
+        except RedisError as e:
+            print(f"Completion cache unavailable: {e}")
+            return None
+        return cached.decode() if cached is not None else None
+    
+    async def _cache_completion(self, key: str, content: str):
+        try:
+            await self._get_cache().setex(key, _COMPLETION_CACHE_TTL, content)
+        except RedisError as e:
+            print(f"Completion cache unavailable: {e}")
     
     async def _generate_content(
         self,
         system_prompt: str,
-        user_prompt: str
+        user_prompt: str,
+        use_cache: bool = True
     ) -> str:
         """
         Call OpenRouter API to generate content
@@ -255,24 +522,67 @@ Richtlinien: {grant_guidelines}
         Args:
             system_prompt: System instructions
             user_prompt: User request
+            use_cache: Return a cached completion for the same prompts if any
             
         Returns:
             Generated text content
         """
+        cache_key = self._completion_cache_key(system_prompt, user_prompt)
+        if cache_key and use_cache:
+            cached = await self._get_cached_completion(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ]
             
-            return await self.client.chat_completion(
+            async with self._get_semaphore():
+                content = await self.client.chat_completion(
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+        except Exception as e:
+            print(f"Error generating content: {e}")
+            raise
+        
+        if cache_key:
+            await self._cache_completion(cache_key, content)
+        
+        return content
+    
+    async def _generate_content_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str
+    ) -> AsyncIterator[str]:
+        """Call OpenRouter API and yield content as it is streamed"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        # No batch semaphore here: a stream is paced by its client and holds
+        # the connection for its whole length, which would starve batch jobs
+        parts: List[str] = []
+        try:
+            async for chunk in self.client.chat_completion_stream(
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
-            )
+            ):
+                parts.append(chunk)
+                yield chunk
         except Exception as e:
             print(f"Error generating content: {e}")
             raise
+        
+        cache_key = self._completion_cache_key(system_prompt, user_prompt)
+        if cache_key:
+            await self._cache_completion(cache_key, "".join(parts))
 
 
 # Singleton instance
@@ -7,12 +7,21 @@ import hashlib
 import json
 import re
 import logging
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 import os
 
+import numpy as np
+import orjson
+import zstandard
+from cachetools import LRUCache
+
 logger = logging.getLogger(__name__)
 
 # Try to import OpenAI
@@ -23,6 +32,89 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 
+# Patterns for rule-based classification, compiled once at import
+EXPIRATION_KEYWORDS = ('eingestellt', 'beendet', 'ausgelaufen', 'nicht mehr verfügbar', 'geschlossen')
+_EXPIRATION_RE = re.compile('|'.join(map(re.escape, EXPIRATION_KEYWORDS)))
+
+# All deadline phrasings in one alternation; group 1 tells which one matched
+DEADLINE_KEYWORDS = ('antragsfrist', 'deadline', 'bis zum')
+_DEADLINE_RE = re.compile(
+    r'(' + '|'.join(map(re.escape, DEADLINE_KEYWORDS)) + r')[:\s]+(\d{1,2}\.\d{1,2}\.\d{4})'
+)
+
+_AMOUNT_RES = [
+    re.compile(r'bis zu[:\s]+([\d.,]+)\s*(euro|€)'),
+    re.compile(r'maximal[:\s]+([\d.,]+)\s*(euro|€)'),
+    re.compile(r'([\d.,]+)\s*(euro|€)\s*förderung'),
+]
+_PERCENT_RE = re.compile(r'(\d{1,3})\s*%')
+
+
+def _first_deadlines(text: str) -> Dict[str, str]:
+    """First date found after each deadline keyword, from a single scan."""
+    deadlines: Dict[str, str] = {}
+    for match in _DEADLINE_RE.finditer(text):
+        deadlines.setdefault(match.group(1), match.group(2))
+    return deadlines
+
+
+# Concurrent LLM requests when classifying a batch of scraped pages
+LLM_CONCURRENCY = 20
+
+# Program fields compared by calculate_content_hash
+_RELEVANT_FIELDS = (
+    'name', 'beschreibung', 'foerderhoehe_min', 'foerderhoehe_max',
+    'foerderquote', 'deadline', 'voraussetzungen', 'zielgruppe'
+)
+
+# MinHash sketch of the word set, used to estimate the Jaccard similarity of
+# old and new content without keeping or intersecting the full word sets
+MINHASH_PERMUTATIONS = 128
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)
+_MINHASH_A = _rng.randint(1, 1 << 61, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.randint(0, 1 << 61, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+del _rng
+
+
+def word_minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the words in text, or None if it has no words."""
+    words = set(text.split())
+    if not words:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(word.encode('utf-8')) for word in words),
+        dtype=np.uint64,
+        count=len(words)
+    )
+    # One universal hash per permutation, applied to all words at once
+    permuted = (hashes[:, np.newaxis] * _MINHASH_A + _MINHASH_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+# Size of the differing region sent to the LLM, plus unchanged context on
+# either side so labels like "Antragsfrist:" and whole values stay visible
+DIFF_WINDOW_CHARS = 1500
+DIFF_CONTEXT_CHARS = 200
+
+
+def changed_window(old: str, new: str, limit: int = DIFF_WINDOW_CHARS) -> Tuple[str, str]:
+    """
+    Differing region of old and new content with DIFF_CONTEXT_CHARS of
+    shared context around it; the region itself is bounded to limit
+    characters per side.
+    """
+    prefix = len(os.path.commonprefix([old, new]))
+    # Common suffix, not overlapping the common prefix
+    suffix = len(os.path.commonprefix([old[prefix:][::-1], new[prefix:][::-1]]))
+    
+    start = max(0, prefix - DIFF_CONTEXT_CHARS)
+    old_end = min(len(old) - suffix, prefix + limit) + DIFF_CONTEXT_CHARS
+    new_end = min(len(new) - suffix, prefix + limit) + DIFF_CONTEXT_CHARS
+    return old[start:old_end], new[start:new_end]
+
+
 class ChangeType(Enum):
     """Types of detected changes."""
     NEW_PROGRAM = "new_program"
@@ -89,13 +181,22 @@ Antworte im JSON-Format:
     "priority": "high/medium/low"
 }}"""
 
-    def __init__(self, db_session=None, api_key: str = None):
+    def __init__(
+        self,
+        db_session=None,
+        api_key: str = None,
+        store_path: str = None,
+        cache_size: int = 10_000
+    ):
         """
         Initialize change detection service.
         
         Args:
             db_session: Database session for storing change history
             api_key: OpenAI API key for LLM classification
+            store_path: SQLite file keeping page state across runs
+                (default: CHANGE_DETECTION_DB or in-memory only)
+            cache_size: Number of URLs whose hashes are kept in memory
         """
         self.db_session = db_session
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
@@ -104,30 +205,88 @@ Antworte im JSON-Format:
         if OPENAI_AVAILABLE and self.api_key:
             self.client = OpenAI(api_key=self.api_key)
         
-        # In-memory cache for hashes (would be database in production)
-        self._hash_cache: Dict[str, Dict] = {}
+        # Hash and MinHash of recently seen URLs; page content only lives
+        # in the store, zstd-compressed
+        self._hash_cache: LRUCache = LRUCache(maxsize=cache_size)
+        # LLM classifications keyed by a hash of the changed content window
+        self._llm_cache: LRUCache = LRUCache(maxsize=cache_size)
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+        
+        self._store = sqlite3.connect(
+            store_path or os.getenv('CHANGE_DETECTION_DB', ':memory:')
+        )
+        self._store.execute("PRAGMA journal_mode=WAL")
+        self._store.execute("PRAGMA synchronous=NORMAL")
+        self._store.execute(
+            "CREATE TABLE IF NOT EXISTS page_state ("
+            "url TEXT PRIMARY KEY, hash TEXT NOT NULL, minhash BLOB, "
+            "content_zstd BLOB NOT NULL, last_seen INTEGER NOT NULL)"
+        )
+    
+    def close(self):
+        """Close the page state store."""
+        self._store.close()
+    
+    def _get_state(self, url: str) -> Optional[Dict]:
+        """Hash and MinHash last stored for url, or None if never seen."""
+        state = self._hash_cache.get(url)
+        if state is None:
+            row = self._store.execute(
+                "SELECT hash, minhash FROM page_state WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            state = {
+                'hash': row[0],
+                'minhash': np.frombuffer(row[1], dtype=np.uint64) if row[1] is not None else None
+            }
+            self._hash_cache[url] = state
+        return state
+    
+    def _get_content(self, url: str) -> str:
+        """Lowercased content last stored for url."""
+        row = self._store.execute(
+            "SELECT content_zstd FROM page_state WHERE url = ?", (url,)
+        ).fetchone()
+        return self._decompressor.decompress(row[0]).decode('utf-8') if row else ''
+    
+    def _put_state(self, url: str, content_hash: str, minhash: Optional[np.ndarray], lowered: str):
+        """Remember the current state of url."""
+        self._hash_cache[url] = {'hash': content_hash, 'minhash': minhash}
+        self._store.execute(
+            "INSERT OR REPLACE INTO page_state VALUES (?, ?, ?, ?, ?)",
+            (
+                url,
+                content_hash,
+                minhash.tobytes() if minhash is not None else None,
+                self._compressor.compress(lowered.encode('utf-8')),
+                int(time.time())
+            )
+        )
+        self._store.commit()
     
     def calculate_hash(self, content: str) -> str:
-        """Calculate SHA256 hash of content."""
-        # Normalize content (remove extra whitespace, lowercase)
-        normalized = ' '.join(content.lower().split())
-        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        """Calculate a fingerprint of content for equality comparison."""
+        return self._hash_lowered(content.lower())
+    
+    def _hash_lowered(self, lowered: str) -> str:
+        """Fingerprint of already lowercased content."""
+        # Normalize whitespace
+        normalized = ' '.join(lowered.split())
+        # Not security relevant - BLAKE2b is considerably faster than SHA-256
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
     
     def calculate_content_hash(self, program_data: Dict) -> str:
         """Calculate hash of program data fields."""
-        # Select relevant fields for comparison
-        relevant_fields = [
-            'name', 'beschreibung', 'foerderhoehe_min', 'foerderhoehe_max',
-            'foerderquote', 'deadline', 'voraussetzungen', 'zielgruppe'
-        ]
-        
-        content_parts = []
-        for field in relevant_fields:
-            value = program_data.get(field)
-            if value is not None:
-                content_parts.append(f"{field}:{json.dumps(value, sort_keys=True)}")
-        
-        return self.calculate_hash('|'.join(content_parts))
+        # Canonical JSON of the relevant fields, serialized in a single call
+        subset = {
+            field: value for field in _RELEVANT_FIELDS
+            if (value := program_data.get(field)) is not None
+        }
+        return hashlib.blake2b(
+            orjson.dumps(subset, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
     
     def detect_change(
         self, 
@@ -146,10 +305,12 @@ Antworte im JSON-Format:
         Returns:
             Change object if change detected, None otherwise
         """
-        new_hash = self.calculate_hash(new_content)
+        # Lowercase once; hashing, classification and the cache share it
+        new_lower = new_content.lower()
+        new_hash = self._hash_lowered(new_lower)
         
         # Get previous state
-        previous = self._hash_cache.get(source_url)
+        previous = self._get_state(source_url)
         
         if previous is None:
             # First time seeing this URL - might be new program
@@ -168,11 +329,7 @@ Antworte im JSON-Format:
             )
             
             # Store for future comparisons
-            self._hash_cache[source_url] = {
-                'hash': new_hash,
-                'content': new_content[:5000],  # Store truncated content
-                'last_seen': datetime.utcnow()
-            }
+            self._put_state(source_url, new_hash, word_minhash(new_lower), new_lower)
             
             return change
         
@@ -183,40 +340,104 @@ Antworte im JSON-Format:
             return None
         
         # Change detected - classify it
-        old_content = previous.get('content', '')
+        old_lower = self._get_content(source_url)
+        new_minhash = word_minhash(new_lower)
         change = self._classify_change(
             source_url=source_url,
-            old_content=old_content,
-            new_content=new_content,
+            old_lower=old_lower,
+            new_lower=new_lower,
+            old_minhash=previous.get('minhash'),
+            new_minhash=new_minhash,
             old_hash=old_hash,
             new_hash=new_hash,
             program_data=program_data
         )
         
-        # Update cache
-        self._hash_cache[source_url] = {
-            'hash': new_hash,
-            'content': new_content[:5000],
-            'last_seen': datetime.utcnow()
-        }
+        # Update stored state
+        self._put_state(source_url, new_hash, new_minhash, new_lower)
         
         return change
     
+    def detect_changes_batch(
+        self,
+        items: List[Tuple[str, str, Optional[Dict]]],
+        max_workers: int = LLM_CONCURRENCY
+    ) -> List[Optional[Change]]:
+        """
+        Detect changes for several scraped pages.
+        
+        Changes the rules cannot classify are sent to the LLM concurrently
+        up front; the pages are then processed in order as by detect_change.
+        
+        Args:
+            items: (source_url, new_content, program_data) per page
+            max_workers: Maximum number of concurrent LLM requests
+            
+        Returns:
+            Change or None per item, in the same order
+        """
+        if self.client:
+            self._prefetch_llm_classifications(items, max_workers)
+        
+        return [
+            self.detect_change(source_url, new_content, program_data)
+            for source_url, new_content, program_data in items
+        ]
+    
+    def _prefetch_llm_classifications(
+        self,
+        items: List[Tuple[str, str, Optional[Dict]]],
+        max_workers: int
+    ):
+        """Fill the LLM cache for the changes in items that need the LLM."""
+        windows = {}
+        for source_url, new_content, _ in items:
+            previous = self._get_state(source_url)
+            new_lower = new_content.lower()
+            if previous is None or previous['hash'] == self._hash_lowered(new_lower):
+                continue
+            
+            old_lower = self._get_content(source_url)
+            if self._rule_based_classification(old_lower, new_lower, previous['minhash']):
+                continue
+            
+            window = changed_window(old_lower, new_lower)
+            key = self._llm_cache_key(*window)
+            if key not in self._llm_cache:
+                windows[key] = window
+        
+        if not windows:
+            return
+        
+        # Only the HTTP requests run in threads; the cache is filled here
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda window: self._request_llm_classification(*window),
+                windows.values()
+            )
+            for key, result in zip(windows, results):
+                if result:
+                    self._llm_cache[key] = result
+    
     def _classify_change(
         self,
         source_url: str,
-        old_content: str,
-        new_content: str,
+        old_lower: str,
+        new_lower: str,
         old_hash: str,
         new_hash: str,
-        program_data: Dict = None
+        program_data: Dict = None,
+        old_minhash: Optional[np.ndarray] = None,
+        new_minhash: Optional[np.ndarray] = None
     ) -> Change:
-        """Classify the type of change using LLM or rules."""
+        """Classify the type of change using LLM or rules; content is lowercased."""
         
         program_name = program_data.get('name', 'Unknown') if program_data else 'Unknown'
         
         # First, try rule-based classification
-        rule_result = self._rule_based_classification(old_content, new_content)
+        rule_result = self._rule_based_classification(
+            old_lower, new_lower, old_minhash, new_minhash
+        )
         
         if rule_result:
             return Change(
@@ -235,7 +456,7 @@ Antworte im JSON-Format:
         
         # Use LLM for complex cases
         if self.client:
-            llm_result = self._llm_classification(old_content, new_content)
+            llm_result = self._llm_classification(old_lower, new_lower)
             if llm_result:
                 return Change(
                     change_type=ChangeType[llm_result['change_type']],
@@ -268,58 +489,50 @@ Antworte im JSON-Format:
     
     def _rule_based_classification(
         self, 
-        old_content: str, 
-        new_content: str
+        old_lower: str, 
+        new_lower: str,
+        old_minhash: Optional[np.ndarray] = None,
+        new_minhash: Optional[np.ndarray] = None
     ) -> Optional[Dict]:
-        """Rule-based change classification."""
-        old_lower = old_content.lower()
-        new_lower = new_content.lower()
-        
+        """Rule-based change classification of lowercased content."""
         # Check for program expiration
-        expiration_keywords = ['eingestellt', 'beendet', 'ausgelaufen', 'nicht mehr verfügbar', 'geschlossen']
-        for keyword in expiration_keywords:
-            if keyword in new_lower and keyword not in old_lower:
-                return {
-                    'change_type': ChangeType.EXPIRED_PROGRAM,
-                    'changed_fields': ['status'],
-                    'confidence': 0.9,
-                    'description': f'Programm möglicherweise beendet: "{keyword}" gefunden',
-                    'requires_review': True
-                }
+        new_expiration = set(_EXPIRATION_RE.findall(new_lower))
+        if new_expiration:
+            old_expiration = set(_EXPIRATION_RE.findall(old_lower))
+            for keyword in EXPIRATION_KEYWORDS:
+                if keyword in new_expiration and keyword not in old_expiration:
+                    return {
+                        'change_type': ChangeType.EXPIRED_PROGRAM,
+                        'changed_fields': ['status'],
+                        'confidence': 0.9,
+                        'description': f'Programm möglicherweise beendet: "{keyword}" gefunden',
+                        'requires_review': True
+                    }
         
         # Check for deadline changes
-        deadline_patterns = [
-            r'antragsfrist[:\s]+(\d{1,2}\.\d{1,2}\.\d{4})',
-            r'deadline[:\s]+(\d{1,2}\.\d{1,2}\.\d{4})',
-            r'bis zum[:\s]+(\d{1,2}\.\d{1,2}\.\d{4})',
-        ]
+        old_deadlines = _first_deadlines(old_lower)
+        new_deadlines = _first_deadlines(new_lower)
         
-        for pattern in deadline_patterns:
-            old_match = re.search(pattern, old_lower)
-            new_match = re.search(pattern, new_lower)
+        for keyword in DEADLINE_KEYWORDS:
+            old_deadline = old_deadlines.get(keyword)
+            new_deadline = new_deadlines.get(keyword)
             
-            if old_match and new_match and old_match.group(1) != new_match.group(1):
+            if old_deadline and new_deadline and old_deadline != new_deadline:
                 return {
                     'change_type': ChangeType.DEADLINE_CHANGED,
                     'changed_fields': ['deadline'],
                     'confidence': 0.95,
-                    'description': f'Antragsfrist geändert: {old_match.group(1)} → {new_match.group(1)}',
+                    'description': f'Antragsfrist geändert: {old_deadline} → {new_deadline}',
                     'requires_review': True
                 }
         
         # Check for amount changes
-        amount_patterns = [
-            r'bis zu[:\s]+([\d.,]+)\s*(euro|€)',
-            r'maximal[:\s]+([\d.,]+)\s*(euro|€)',
-            r'([\d.,]+)\s*(euro|€)\s*förderung',
-        ]
-        
         old_amounts = []
         new_amounts = []
         
-        for pattern in amount_patterns:
-            old_amounts.extend(re.findall(pattern, old_lower))
-            new_amounts.extend(re.findall(pattern, new_lower))
+        for pattern in _AMOUNT_RES:
+            old_amounts.extend(pattern.findall(old_lower))
+            new_amounts.extend(pattern.findall(new_lower))
         
         if old_amounts and new_amounts:
             # Compare amounts
@@ -336,9 +549,8 @@ Antworte im JSON-Format:
                 }
         
         # Check for percentage changes
-        percent_pattern = r'(\d{1,3})\s*%'
-        old_percents = set(re.findall(percent_pattern, old_lower))
-        new_percents = set(re.findall(percent_pattern, new_lower))
+        old_percents = set(_PERCENT_RE.findall(old_lower))
+        new_percents = set(_PERCENT_RE.findall(new_lower))
         
         if old_percents != new_percents:
             return {
@@ -349,12 +561,15 @@ Antworte im JSON-Format:
                 'requires_review': True
             }
         
-        # If content is very different, might be major update
-        old_words = set(old_lower.split())
-        new_words = set(new_lower.split())
+        # If content is very different, might be major update; the
+        # estimated Jaccard similarity is the share of equal MinHash values
+        if old_minhash is None:
+            old_minhash = word_minhash(old_lower)
+        if new_minhash is None:
+            new_minhash = word_minhash(new_lower)
         
-        if old_words and new_words:
-            similarity = len(old_words & new_words) / len(old_words | new_words)
+        if old_minhash is not None and new_minhash is not None:
+            similarity = float(np.mean(old_minhash == new_minhash))
             
             if similarity < 0.5:
                 return {
@@ -367,12 +582,32 @@ Antworte im JSON-Format:
         
         return None
     
+    @staticmethod
+    def _llm_cache_key(old_window: str, new_window: str) -> str:
+        """Cache key for the LLM classification of a content window."""
+        return hashlib.blake2b(
+            f"{old_window}\0{new_window}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+    
     def _llm_classification(self, old_content: str, new_content: str) -> Optional[Dict]:
-        """Use LLM to classify changes."""
+        """Use LLM to classify changes, reusing earlier results for the same change."""
+        # Only send the part that actually changed
+        old_window, new_window = changed_window(old_content, new_content)
+        key = self._llm_cache_key(old_window, new_window)
+        
+        result = self._llm_cache.get(key)
+        if result is None:
+            result = self._request_llm_classification(old_window, new_window)
+            if result:
+                self._llm_cache[key] = result
+        return result
+    
+    def _request_llm_classification(self, old_window: str, new_window: str) -> Optional[Dict]:
+        """Ask the LLM to classify the change between two content windows."""
         try:
             prompt = self.CLASSIFICATION_PROMPT.format(
-                old_content=old_content[:2000],
-                new_content=new_content[:2000]
+                old_content=old_window,
+                new_content=new_window
             )
             
             response = self.client.chat.completions.create(
@@ -0,0 +1,89 @@
+"""
+Deadline parsing for grant programs
+
+Deadlines arrive as free text ("Laufend", "30.06.2025", "2026", ...). They are
+parsed to date ordinals once at ingest and stored as the deadline_ordinal
+payload field so searches can drop expired grants inside Qdrant.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import re
+
+
+# Deadline strings that mark continuous programs
+CONTINUOUS_DEADLINES = frozenset({'laufend', 'fortlaufend', 'keine', 'unbefristet', 'offen', ''})
+
+# Supported date formats, tried in order
+_DEADLINE_PATTERNS = (
+    # ISO format: 2025-06-30, 2025-06-30T23:59:59Z
+    (re.compile(r'(\d{4})-(\d{2})-(\d{2})'), lambda m: date(int(m[1]), int(m[2]), int(m[3]))),
+    # German format: 30.06.2025, 1.7.2025
+    (re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})'), lambda m: date(int(m[3]), int(m[2]), int(m[1]))),
+    # Short German: 30.06.25
+    (re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{2})$'), lambda m: date(2000 + int(m[3]), int(m[2]), int(m[1]))),
+    # Month Year: Juni 2025, 06/2025
+    (re.compile(r'(\d{1,2})/(\d{4})'), lambda m: date(int(m[2]), int(m[1]), 28)),
+    # Just year: 2025, 2026
+    (re.compile(r'^(\d{4})$'), lambda m: date(int(m[1]), 12, 31)),
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_deadline_ordinal(deadline_str: str) -> Optional[int]:
+    """
+    Parse a deadline string to a date ordinal.
+    Returns None for continuous programs and unparseable strings.
+    """
+    deadline_lower = deadline_str.lower().strip()
+    
+    # Continuous programs are always valid
+    if deadline_lower in CONTINUOUS_DEADLINES:
+        return None
+    
+    # Try to parse various date formats
+    for pattern, date_converter in _DEADLINE_PATTERNS:
+        match = pattern.search(deadline_str)
+        if match:
+            try:
+                return date_converter(match).toordinal()
+            except (ValueError, IndexError):
+                continue
+    
+    return None
+
+
+def is_deadline_valid(deadline_str: Optional[str]) -> bool:
+    """
+    Check if a deadline is still valid (not expired).
+    Returns True if:
+    - deadline is None, empty, or "Laufend" (continuous)
+    - deadline date is in the future
+    Returns False if deadline has passed.
+    """
+    if not deadline_str:
+        return True
+    
+    deadline_ordinal = parse_deadline_ordinal(str(deadline_str))
+    
+    # If we can't parse the date, assume it's valid (don't exclude it)
+    if deadline_ordinal is None:
+        return True
+    
+    return deadline_ordinal >= today_ordinal()
+
+
+def today_ordinal() -> int:
+    """Ordinal of today's date, comparable with deadline_ordinal."""
+    return date.today().toordinal()
+
+
+def grant_deadline_ordinal(payload: Dict[str, Any]) -> Optional[int]:
+    """
+    Compute the deadline_ordinal payload field for a grant.
+    Returns None for continuous programs and unparseable deadlines.
+    """
+    deadline = payload.get('deadline')
+    if not deadline or payload.get('is_continuous'):
+        return None
+    return parse_deadline_ordinal(str(deadline))
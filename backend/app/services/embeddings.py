@@ -1,11 +1,35 @@
 """
 Embedding Service for text-to-vector conversion using OpenRouter
 """
-from typing import List
+from typing import Dict, List
+from array import array
+import asyncio
+import hashlib
+
+from cachetools import TTLCache
+
 from app.core.config import settings
 from app.services.openrouter_client import openrouter_client
 
 
+# The embeddings API accepts at most 2048 inputs per request
+EMBEDDING_BATCH_SIZE = 2048
+
+# Search-query embeddings keyed by a digest of the normalized query text.
+# Vectors are stored as float32 arrays, half the size of a list of floats.
+_query_embeddings: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+
+# In-flight embedding requests, so concurrent misses for the same query
+# share one API call.
+_pending_query_embeddings: Dict[bytes, asyncio.Task] = {}
+
+
+def _query_cache_key(text: str) -> bytes:
+    """Content address for a query: lowercased, whitespace collapsed."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode()).digest()
+
+
 class EmbeddingService:
     """Service for generating embeddings via OpenRouter"""
     
@@ -29,6 +53,36 @@ class EmbeddingService:
             print(f"Error generating embedding: {e}")
             raise
     
+    async def embed_query(self, text: str) -> List[float]:
+        """
+        Generate embedding for a search query, reusing recent results
+        
+        Repeated searches (same profile and description) skip the
+        embedding API call entirely; concurrent identical searches wait
+        on a single call.
+        
+        Args:
+            text: Query text to embed
+            
+        Returns:
+            List of floats representing the embedding vector
+        """
+        cache_key = _query_cache_key(text)
+        cached = _query_embeddings.get(cache_key)
+        if cached is not None:
+            return cached.tolist()
+        
+        task = _pending_query_embeddings.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self.embed_text(text))
+            _pending_query_embeddings[cache_key] = task
+            task.add_done_callback(lambda _: _pending_query_embeddings.pop(cache_key, None))
+        
+        # Shielded so one cancelled caller doesn't fail the others waiting
+        embedding = await asyncio.shield(task)
+        _query_embeddings[cache_key] = array('f', embedding)
+        return embedding
+    
     async def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts (batch)
@@ -40,16 +94,16 @@ class EmbeddingService:
             List of embedding vectors
         """
         embeddings = []
-        for text in texts:
-            try:
-                embedding = await self.embed_text(text)
-                embeddings.append(embedding)
-            except Exception as e:
-                print(f"Error embedding text: {e}")
-                raise
+        try:
+            # One request per batch instead of one round-trip per text
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+                batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+                embeddings.extend(await self.client.create_embeddings(batch))
+        except Exception as e:
+            print(f"Error embedding texts: {e}")
+            raise
         return embeddings
 
-
 # Singleton instance
 embedding_service = EmbeddingService()
 
@@ -39,11 +39,11 @@ class GrantMatcher:
             budget,
             location
         )
-        query_vector = await embedding_service.embed_text(query_text)
+        query_vector = await embedding_service.embed_query(query_text)
         
         # 2. Search in Qdrant
         # Get more results for post-processing
-        raw_results = qdrant_service.search_similar_grants(
+        raw_results = await qdrant_service.search_similar_grants_async(
             query_vector=query_vector,
             limit=limit * 5,
             score_threshold=0.5
@@ -111,7 +111,7 @@ class GrantMatcher:
                     deadline = datetime.fromisoformat(payload["deadline"].replace("Z", "+00:00"))
                     if deadline < datetime.now(deadline.tzinfo):
                         continue  # Deadline passed
-                except:
+                except (ValueError, AttributeError):
                     pass  # Invalid date format, keep grant
             
             # TODO: Add more filters (location, company size, etc.)
@@ -148,7 +148,7 @@ class GrantMatcher:
                         final_score *= 1.2  # 20% boost for urgent deadlines
                     elif days_until < 60:
                         final_score *= 1.1  # 10% boost
-                except:
+                except (ValueError, AttributeError):
                     pass
             
             result["match_score"] = final_score
@@ -0,0 +1,206 @@
+"""
+Shaping of Qdrant grant payloads into API response dicts
+
+Kept free of framework imports and fully annotated so it can be compiled
+with mypyc (`mypyc app/services/grants_shape.py`); the pure-Python module
+is used unchanged when no compiled extension is present.
+"""
+from typing import Any, Dict, List, Optional
+import re
+
+from app.services.deadlines import parse_deadline_ordinal
+
+
+_FUNDING_RE = re.compile(r'\d+(?:\.\d+)?')
+# German number format: drop thousands separators, comma becomes decimal point
+_FUNDING_PUNCT_TABLE = str.maketrans({'.': '', ',': '.'})
+
+# Federal funder keywords, matched against the lowercased funder in one pass
+_FEDERAL_FUNDER_RE = re.compile(r'bund|bmw|bafa|kfw')
+
+# Payload fields passed to the writer as grant guidelines, in prompt order
+_GUIDELINE_FIELDS = (
+    ('name', 'Förderprogramm'),
+    ('funder', 'Fördergeber'),
+    ('who_is_funded', 'Wer wird gefördert'),
+    ('what_is_funded', 'Was wird gefördert'),
+    ('funding_amount', 'Förderhöhe'),
+    ('requirements', 'Voraussetzungen'),
+    ('guidelines', 'Richtlinien'),
+)
+
+GRANT_TYPES = frozenset({'federal', 'state', 'eu', 'municipal'})
+GRANT_CATEGORIES = frozenset({'innovation', 'digitalization', 'green_tech', 'export', 'training', 'regional'})
+
+
+def parse_max_funding(funding_str: Any) -> float:
+    """Extract the upper bound from a free-text amount like 'bis 50.000 EUR'."""
+    if not funding_str:
+        return 0.0
+    text = str(funding_str)
+    if 'bis' not in text.lower():
+        return 0.0
+    # Every match is a valid float literal, so no exception handling needed
+    numbers: List[str] = _FUNDING_RE.findall(text.translate(_FUNDING_PUNCT_TABLE))
+    return float(numbers[-1]) if numbers else 0.0
+
+
+def is_expired(payload: Dict[str, Any], deadline: Any, today_ord: int) -> bool:
+    """
+    True if the grant's deadline lies before today_ord.
+
+    Uses the deadline_ordinal parsed at ingest; only points stored before
+    that field existed fall back to parsing the deadline string.
+    """
+    deadline_ordinal: Optional[int]
+    if 'deadline_ordinal' in payload:
+        deadline_ordinal = payload['deadline_ordinal']
+    elif deadline:
+        deadline_ordinal = parse_deadline_ordinal(str(deadline))
+    else:
+        return False
+    return deadline_ordinal is not None and deadline_ordinal < today_ord
+
+
+def _infer_type(funder: str) -> str:
+    if _FEDERAL_FUNDER_RE.search(funder.lower()):
+        return 'federal'
+    # Known state funders and unknown funders both map to 'state'
+    return 'state'
+
+
+def _infer_category(what_is_funded: str) -> str:
+    what_funded_lc = what_is_funded.lower()
+    if 'innovation' in what_funded_lc or 'forschung' in what_funded_lc:
+        return 'innovation'
+    if 'digital' in what_funded_lc or 'it' in what_funded_lc:
+        return 'digitalization'
+    if 'klima' in what_funded_lc or 'umwelt' in what_funded_lc or 'energie' in what_funded_lc:
+        return 'green_tech'
+    return 'digitalization'
+
+
+def build_grant_dict(
+    payload: Dict[str, Any],
+    point_id: Any,
+    score: float,
+    today_ord: int
+) -> Optional[Dict[str, Any]]:
+    """Convert a Qdrant search hit to Grant format, or None if it has expired."""
+    get = payload.get
+    funder: str = get('funder') or ''
+
+    # Handle deadline first so expired programs are skipped cheaply
+    deadline = get('deadline')
+    if deadline == 'Laufend' or get('is_continuous'):
+        deadline = 'Laufend'
+    if is_expired(payload, deadline, today_ord):
+        return None
+
+    # Extract funding amount - handle both formats
+    max_funding: float
+    if get('max_funding'):
+        max_funding = float(payload['max_funding'])
+    else:
+        max_funding = parse_max_funding(get('funding_amount'))
+
+    grant_type = get('type', 'federal')
+    if grant_type not in GRANT_TYPES:
+        grant_type = _infer_type(funder)
+
+    grant_category = get('category', 'digitalization')
+    if grant_category not in GRANT_CATEGORIES:
+        grant_category = _infer_category(get('what_is_funded') or '')
+
+    return {
+        "id": get('url') or get('website_url') or get('external_id') or str(point_id),
+        # Handle both name formats: some use 'name', others use 'title'
+        "name": get('name') or get('title') or 'Unbekannt',
+        "type": grant_type,
+        "category": grant_category,
+        "max_funding": max_funding,
+        "deadline": deadline,
+        "description": (get('description') or '')[:500],
+        "eligibility": [
+            get('who_is_funded') or 'Nicht angegeben',
+            f"Fördergeber: {funder or 'Nicht angegeben'}",
+            f"Region: {get('region') or 'Deutschland'}"
+        ],
+        "success_rate": get('historical_success_rate') or 0.60,
+        "match_score": score
+    }
+
+
+def build_listed_grant_dict(
+    payload: Dict[str, Any],
+    point_id: Any,
+    today_ord: int
+) -> Optional[Dict[str, Any]]:
+    """Convert a scrolled Qdrant point to Grant format, or None if it has expired."""
+    get = payload.get
+
+    deadline = get('deadline', 'Laufend')
+    if is_expired(payload, deadline, today_ord):
+        return None
+
+    max_funding = float(get('max_funding', 0))
+    if max_funding == 0:
+        max_funding = parse_max_funding(get('funding_amount', ''))
+
+    return {
+        "id": get('url') or get('external_id') or str(point_id),
+        "name": get('name') or get('title') or 'Unbekannt',
+        "type": get('type', 'federal'),
+        "category": get('category', 'digitalization'),
+        "max_funding": max_funding,
+        "deadline": deadline,
+        "description": (get('description') or '')[:500],
+        "eligibility": [
+            get('who_is_funded') or 'Nicht angegeben',
+            f"Fördergeber: {get('funder') or 'Nicht angegeben'}"
+        ],
+        "success_rate": get('historical_success_rate', 0.60),
+        "match_score": None
+    }
+
+
+def build_grant_detail_dict(payload: Dict[str, Any], grant_id: str) -> Dict[str, Any]:
+    """Convert a Qdrant point to GrantDetail format."""
+    get = payload.get
+
+    return {
+        "id": grant_id,
+        "name": get('name') or get('title') or 'Unbekannt',
+        "type": get('type', 'federal'),
+        "category": get('category', 'digitalization'),
+        "max_funding": float(get('max_funding', 0)),
+        "deadline": get('deadline', 'Laufend'),
+        "description": get('description', ''),
+        "eligibility": [
+            get('who_is_funded') or 'Nicht angegeben',
+            f"Fördergeber: {get('funder') or 'Nicht angegeben'}",
+            f"Region: {get('region') or 'Deutschland'}"
+        ],
+        "success_rate": get('historical_success_rate', 0.60),
+        "requirements": get('requirements', []) if isinstance(get('requirements'), list) else [get('requirements', 'Siehe Website')],
+        "application_process": get('application_process', 'Siehe offizielle Website für Details'),
+        "duration": get('duration', 'Nicht angegeben'),
+        "contact": {
+            "website": get('url') or get('website_url', ''),
+            "email": get('contact_email', ''),
+            "phone": get('contact_phone', ''),
+            "funder": get('funder', 'Nicht angegeben')
+        }
+    }
+
+
+def build_grant_guidelines(payload: Dict[str, Any]) -> str:
+    """Guideline text for the application writer from a Qdrant grant payload."""
+    lines: List[str] = []
+    for key, label in _GUIDELINE_FIELDS:
+        value = payload.get(key)
+        if isinstance(value, list):
+            value = '; '.join(str(item) for item in value)
+        if value:
+            lines.append(f"{label}: {value}")
+    return '\n'.join(lines)
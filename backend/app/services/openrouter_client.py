@@ -1,8 +1,10 @@
 """
 OpenRouter Client - Alternative zu OpenAI mit mehr Modell-Optionen
 """
+import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import AsyncIterator, List, Dict, Any, Optional
 from app.core.config import settings
 
 
@@ -25,6 +27,34 @@ class OpenRouterClient:
         
         # Fallback wenn kein OpenRouter Key
         self.use_openai_fallback = not self.api_key or self.api_key == ""
+        
+        # Pooled HTTP client shared by concurrent requests; rebuilt when the
+        # event loop changes (Celery tasks run each asyncio.run on a fresh loop,
+        # and close the client before it ends via app.tasks.run_async)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                # HTTP/2 lets concurrent section calls share one connection
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+                timeout=httpx.Timeout(120.0, connect=10.0)
+            )
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
     
     async def chat_completion(
         self,
@@ -46,25 +76,73 @@ class OpenRouterClient:
         if self.use_openai_fallback:
             return await self._openai_fallback_chat(messages, temperature, max_tokens)
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=self.headers,
-                    json={
-                        "model": self.chat_model,
-                        "messages": messages,
-                        "temperature": temperature,
-                        "max_tokens": max_tokens
-                    }
-                )
+        try:
+            response = await self._http_client().post(
+                "/chat/completions",
+                json={
+                    "model": self.chat_model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data["choices"][0]["message"]["content"]
+            
+        except Exception as e:
+            print(f"OpenRouter error: {e}")
+            raise
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 4000
+    ) -> AsyncIterator[str]:
+        """
+        Chat completion streamed as Server-Sent Events
+        
+        Args:
+            messages: Liste von Messages [{"role": "user", "content": "..."}]
+            temperature: Kreativität (0-1)
+            max_tokens: Max Tokens für Antwort
+            
+        Yields:
+            Text deltas as they are generated
+        """
+        if self.use_openai_fallback:
+            yield await self._openai_fallback_chat(messages, temperature, max_tokens)
+            return
+        
+        try:
+            async with self._http_client().stream(
+                "POST",
+                "/chat/completions",
+                json={
+                    "model": self.chat_model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": True
+                }
+            ) as response:
                 response.raise_for_status()
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-                
-            except Exception as e:
-                print(f"OpenRouter error: {e}")
-                raise
+                async for line in response.aiter_lines():
+                    # Skip blank separators and ": OPENROUTER PROCESSING" keep-alives
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+                    choices = orjson.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+                        
+        except Exception as e:
+            print(f"OpenRouter stream error: {e}")
+            raise
     
     async def create_embedding(
         self,
@@ -82,34 +160,75 @@ class OpenRouterClient:
         if self.use_openai_fallback:
             return await self._openai_fallback_embedding(text)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/embeddings",
-                    headers=self.headers,
-                    json={
-                        "model": self.embedding_model,
-                        "input": text
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                # Handle different response formats
-                if "data" in data and len(data["data"]) > 0:
-                    return data["data"][0]["embedding"]
-                elif "embedding" in data:
-                    return data["embedding"]
-                else:
-                    print(f"Unexpected embedding response format: {list(data.keys())}")
-                    raise ValueError(f"Unexpected response format from embedding API: {list(data.keys())}")
-                
-            except httpx.HTTPStatusError as e:
-                print(f"OpenRouter embedding HTTP error: {e.response.status_code} - {e.response.text}")
-                raise
-            except Exception as e:
-                print(f"OpenRouter embedding error: {e}")
-                raise
+        try:
+            response = await self._http_client().post(
+                "/embeddings",
+                json={
+                    "model": self.embedding_model,
+                    "input": text
+                },
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            # Handle different response formats
+            if "data" in data and len(data["data"]) > 0:
+                return data["data"][0]["embedding"]
+            elif "embedding" in data:
+                return data["embedding"]
+            else:
+                print(f"Unexpected embedding response format: {list(data.keys())}")
+                raise ValueError(f"Unexpected response format from embedding API: {list(data.keys())}")
+            
+        except httpx.HTTPStatusError as e:
+            print(f"OpenRouter embedding HTTP error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"OpenRouter embedding error: {e}")
+            raise
+    
+    async def create_embeddings(
+        self,
+        texts: List[str]
+    ) -> List[List[float]]:
+        """
+        Create embeddings for several texts in a single request
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        if self.use_openai_fallback:
+            return await self._openai_fallback_embeddings(texts)
+        
+        try:
+            response = await self._http_client().post(
+                "/embeddings",
+                json={
+                    "model": self.embedding_model,
+                    "input": texts
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if "data" not in data or len(data["data"]) != len(texts):
+                print(f"Unexpected embedding response format: {list(data.keys())}")
+                raise ValueError(f"Unexpected response format from embedding API: {list(data.keys())}")
+            
+            # Items carry their input position; don't rely on response order
+            items = sorted(data["data"], key=lambda item: item.get("index", 0))
+            return [item["embedding"] for item in items]
+            
+        except httpx.HTTPStatusError as e:
+            print(f"OpenRouter embedding HTTP error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            print(f"OpenRouter embedding error: {e}")
+            raise
     
     async def _openai_fallback_chat(
         self,
@@ -139,6 +258,17 @@ class OpenRouterClient:
             input=text
         )
         return response.data[0].embedding
+    
+    async def _openai_fallback_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Batched fallback zu OpenAI Embeddings"""
+        import openai
+        openai.api_key = settings.OPENAI_API_KEY
+        
+        response = await openai.embeddings.create(
+            model="text-embedding-3-large",
+            input=texts
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
 
 # Singleton instance
@@ -2,39 +2,77 @@
 Qdrant Vector Database Service for grant storage and similarity search
 """
 from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    PointStruct, Filter, FieldCondition, MatchAny, MatchValue,
+    IsEmptyCondition, PayloadField, Range, QuantizationSearchParams, SearchParams
+)
 import uuid
 
 from app.core.config import settings
+from app.services.deadlines import grant_deadline_ordinal
+from app.services.qdrant_schema import URL_FIELDS, VECTOR_SIZE, ensure_grants_collection
+
+
+# Searches scan int8-quantized vectors, then rescore the oversampled
+# candidates against the full-precision originals
+_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
 
 
 class QdrantService:
     """Service for interacting with Qdrant vector database"""
     
     def __init__(self):
-        self.client = QdrantClient(
+        connection = dict(
             host=settings.QDRANT_HOST,
-            port=settings.QDRANT_PORT
+            port=settings.QDRANT_PORT,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC
         )
+        self.client = QdrantClient(**connection)
+        # Non-blocking client for the read paths used by the API
+        self.async_client = AsyncQdrantClient(**connection)
         self.collection_name = settings.QDRANT_COLLECTION
-        self.vector_size = 3072  # OpenAI text-embedding-3-large (full dimensions)
+        self.vector_size = VECTOR_SIZE
+    
+    @staticmethod
+    def _build_filter(
+        filter_conditions: Optional[Dict[str, Any]],
+        min_deadline_ordinal: Optional[int] = None
+    ) -> Optional[Filter]:
+        """
+        Build a Qdrant filter from exact-match field-value pairs
+        
+        With min_deadline_ordinal, grants whose deadline_ordinal is earlier
+        are excluded. Continuous grants and points stored before the field
+        existed have no deadline_ordinal and always pass.
+        """
+        must = [
+            FieldCondition(key=key, match=MatchValue(value=value))
+            for key, value in (filter_conditions or {}).items()
+        ]
+        if min_deadline_ordinal is not None:
+            must.append(Filter(should=[
+                FieldCondition(key="deadline_ordinal", range=Range(gte=min_deadline_ordinal)),
+                IsEmptyCondition(is_empty=PayloadField(key="deadline_ordinal"))
+            ]))
+        return Filter(must=must) if must else None
+    
+    @staticmethod
+    def point_id(grant_id: str) -> str:
+        """Stable point id derived from a grant identifier"""
+        return str(uuid.uuid5(uuid.NAMESPACE_DNS, grant_id))
     
     def ensure_collection(self):
-        """Create collection if it doesn't exist"""
+        """Create the collection if it doesn't exist, or add missing quantization and indexes"""
         try:
-            collections = self.client.get_collections().collections
-            exists = any(c.name == self.collection_name for c in collections)
-            
-            if not exists:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=Distance.COSINE
-                    )
-                )
+            outcome = ensure_grants_collection(self.client, self.collection_name)
+            if outcome == "created":
                 print(f"Created collection: {self.collection_name}")
+            elif outcome == "quantized":
+                print(f"Enabled int8 quantization on collection: {self.collection_name}")
         except Exception as e:
             print(f"Error ensuring collection: {e}")
             raise
@@ -54,8 +92,10 @@ class QdrantService:
             payload: Metadata (grant details)
         """
         try:
+            # Parse the deadline once here so searches can filter on it
+            payload = {**payload, "deadline_ordinal": grant_deadline_ordinal(payload)}
             point = PointStruct(
-                id=str(uuid.uuid5(uuid.NAMESPACE_DNS, grant_id)),
+                id=self.point_id(grant_id),
                 vector=vector,
                 payload=payload
             )
@@ -73,7 +113,8 @@ class QdrantService:
         query_vector: List[float],
         limit: int = 100,
         score_threshold: float = 0.5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        min_deadline_ordinal: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar grants using vector similarity
@@ -83,54 +124,66 @@ class QdrantService:
             limit: Maximum number of results
             score_threshold: Minimum similarity score
             filters: Optional filters (e.g., {"type": "federal"})
+            min_deadline_ordinal: Optional date ordinal; drops grants expiring earlier
             
         Returns:
             List of matching grants with scores
         """
         try:
-            # Build filters if provided
-            query_filter = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    conditions.append(
-                        FieldCondition(
-                            key=key,
-                            match=MatchValue(value=value)
-                        )
-                    )
-                if conditions:
-                    query_filter = Filter(must=conditions)
-            
-            # Search
             results = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
                 limit=limit,
                 score_threshold=score_threshold,
-                query_filter=query_filter
+                query_filter=self._build_filter(filters, min_deadline_ordinal),
+                search_params=_SEARCH_PARAMS
             )
-            
-            # Format results
-            return [
-                {
-                    "id": result.id,
-                    "score": result.score,
-                    "payload": result.payload
-                }
-                for result in results
-            ]
+            return self._format_scored(results)
+        except Exception as e:
+            print(f"Error searching grants: {e}")
+            raise
+    
+    async def search_similar_grants_async(
+        self,
+        query_vector: List[float],
+        limit: int = 100,
+        score_threshold: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None,
+        min_deadline_ordinal: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_similar_grants for use on the event loop"""
+        try:
+            results = await self.async_client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                limit=limit,
+                score_threshold=score_threshold,
+                query_filter=self._build_filter(filters, min_deadline_ordinal),
+                search_params=_SEARCH_PARAMS
+            )
+            return self._format_scored(results)
         except Exception as e:
             print(f"Error searching grants: {e}")
             raise
     
+    @staticmethod
+    def _format_scored(results) -> List[Dict[str, Any]]:
+        """Format scored points returned by a vector search"""
+        return [
+            {
+                "id": result.id,
+                "score": result.score,
+                "payload": result.payload
+            }
+            for result in results
+        ]
+    
     def delete_grant(self, grant_id: str):
         """Delete a grant from the vector database"""
         try:
-            point_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, grant_id))
             self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=[point_id]
+                points_selector=[self.point_id(grant_id)]
             )
         except Exception as e:
             print(f"Error deleting grant {grant_id}: {e}")
@@ -152,38 +205,123 @@ class QdrantService:
             List of matching grants
         """
         try:
-            conditions = []
-            for key, value in filter_conditions.items():
-                conditions.append(
-                    FieldCondition(
-                        key=key,
-                        match=MatchValue(value=value)
-                    )
-                )
-            
-            query_filter = Filter(must=conditions) if conditions else None
-            
             # Use scroll to get points with filter
             results, _ = self.client.scroll(
                 collection_name=self.collection_name,
-                scroll_filter=query_filter,
+                scroll_filter=self._build_filter(filter_conditions),
                 limit=limit,
                 with_payload=True,
                 with_vectors=False
             )
-            
-            return [
-                {
-                    "id": result.id,
-                    "payload": result.payload,
-                    "score": 1.0  # No similarity score for filter-only search
-                }
-                for result in results
-            ]
+            return self._format_filtered(results)
         except Exception as e:
             print(f"Error searching grants by filter: {e}")
             raise
     
+    async def search_grants_by_filter_async(
+        self,
+        filter_conditions: Dict[str, Any],
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_grants_by_filter for use on the event loop"""
+        try:
+            results, _ = await self.async_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._build_filter(filter_conditions),
+                limit=limit,
+                with_payload=True,
+                with_vectors=False
+            )
+            return self._format_filtered(results)
+        except Exception as e:
+            print(f"Error searching grants by filter: {e}")
+            raise
+    
+    @staticmethod
+    def _raw_point_id(grant_id: str) -> Optional[Any]:
+        """grant_id as a point id, for grants whose public id is the point id itself"""
+        if grant_id.isdigit():
+            return int(grant_id)
+        try:
+            return str(uuid.UUID(grant_id))
+        except ValueError:
+            return None
+    
+    async def retrieve_grants_async(self, grant_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch grants by the public id the API hands out
+        
+        Ids are looked up as point ids first: derived from the id used at
+        upsert, or the point id itself for grants listed under it. Ids that
+        miss are then matched against the url and website_url payload
+        fields in one scroll, since importers key points by their own ids.
+        
+        Args:
+            grant_ids: Grant identifiers (URL, external id or point id)
+            
+        Returns:
+            List of the grants found, in no particular order, each with the
+            requested id it matched under "grant_id"
+        """
+        requested: Dict[Any, str] = {}
+        for grant_id in grant_ids:
+            requested.setdefault(self.point_id(grant_id), grant_id)
+            raw_point_id = self._raw_point_id(grant_id)
+            if raw_point_id is not None:
+                requested.setdefault(raw_point_id, grant_id)
+        
+        try:
+            points = await self.async_client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(requested),
+                with_payload=True,
+                with_vectors=False
+            )
+            matched = {}
+            for point in points:
+                matched.setdefault(requested[point.id], point)
+            
+            missing = [grant_id for grant_id in dict.fromkeys(grant_ids) if grant_id not in matched]
+            if missing:
+                points, _ = await self.async_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=Filter(should=[
+                        FieldCondition(key=key, match=MatchAny(any=missing))
+                        for key in URL_FIELDS
+                    ]),
+                    # Enough for one point per id; extra duplicates of a URL are dropped
+                    limit=len(missing),
+                    with_payload=True,
+                    with_vectors=False
+                )
+                missing_ids = set(missing)
+                for point in points:
+                    for key in URL_FIELDS:
+                        url = point.payload.get(key)
+                        if url in missing_ids and url not in matched:
+                            matched[url] = point
+                            break
+        except Exception as e:
+            print(f"Error retrieving grants: {e}")
+            raise
+        
+        return [
+            {**result, "grant_id": grant_id}
+            for grant_id, result in zip(matched, self._format_filtered(matched.values()))
+        ]
+    
+    @staticmethod
+    def _format_filtered(results) -> List[Dict[str, Any]]:
+        """Format points returned by a filter-only search"""
+        return [
+            {
+                "id": result.id,
+                "payload": result.payload,
+                "score": 1.0  # No similarity score for filter-only search
+            }
+            for result in results
+        ]
+    
     def scroll_grants(
         self,
         filter_conditions: Optional[Dict[str, Any]] = None,
@@ -202,41 +340,52 @@ class QdrantService:
             List of grants
         """
         try:
-            # Build filter
-            query_filter = None
-            if filter_conditions:
-                conditions = []
-                for key, value in filter_conditions.items():
-                    conditions.append(
-                        FieldCondition(
-                            key=key,
-                            match=MatchValue(value=value)
-                        )
-                    )
-                if conditions:
-                    query_filter = Filter(must=conditions)
-            
             # Scroll with offset
             results, _ = self.client.scroll(
                 collection_name=self.collection_name,
-                scroll_filter=query_filter,
+                scroll_filter=self._build_filter(filter_conditions),
                 limit=limit,
                 offset=offset,
                 with_payload=True,
                 with_vectors=False
             )
-            
-            return [
-                {
-                    "id": result.id,
-                    "payload": result.payload
-                }
-                for result in results
-            ]
+            return self._format_scrolled(results)
+        except Exception as e:
+            print(f"Error scrolling grants: {e}")
+            raise
+    
+    async def scroll_grants_async(
+        self,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Async variant of scroll_grants for use on the event loop"""
+        try:
+            results, _ = await self.async_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._build_filter(filter_conditions),
+                limit=limit,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            return self._format_scrolled(results)
         except Exception as e:
             print(f"Error scrolling grants: {e}")
             raise
     
+    @staticmethod
+    def _format_scrolled(results) -> List[Dict[str, Any]]:
+        """Format points returned by a paginated scroll"""
+        return [
+            {
+                "id": result.id,
+                "payload": result.payload
+            }
+            for result in results
+        ]
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection"""
         try:
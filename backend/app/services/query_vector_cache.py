@@ -0,0 +1,104 @@
+"""
+Similarity-aware cache for grant vector searches
+
+Near-identical queries produce near-identical embeddings, so a recent search
+whose query vector is close enough to the new one can be answered without
+another Qdrant round-trip.
+"""
+from typing import Any, Dict, List, Optional
+import time
+
+import numpy as np
+
+
+class QueryVectorCache:
+    """Fixed-size cache of (query vector, search results) pairs"""
+
+    def __init__(
+        self,
+        dimensions: int,
+        maxsize: int = 512,
+        threshold: float = 0.97,
+        ttl: float = 600.0
+    ):
+        """
+        Args:
+            dimensions: Embedding vector size
+            maxsize: Number of cached searches; least recently used is evicted
+            threshold: Minimum cosine similarity to reuse cached results
+            ttl: Seconds before an entry expires, so re-imported grants show up
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        # Unit-normalized query vectors, one row per slot
+        self._vectors = np.zeros((maxsize, dimensions), dtype=np.float32)
+        self._results: List[Optional[List[Dict[str, Any]]]] = [None] * maxsize
+        # Monotonic expiry per slot; 0 marks an empty slot
+        self._expires = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._clock = 0
+
+    @staticmethod
+    def _normalize(query_vector: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def get(self, query_vector: List[float]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return cached results for the most similar recent query
+
+        Args:
+            query_vector: Query embedding
+
+        Returns:
+            Cached search results, or None if no live entry is similar enough
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return None
+
+        live = self._expires > time.monotonic()
+        if not live.any():
+            return None
+
+        similarities = self._vectors @ vector
+        similarities[~live] = -np.inf
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < self.threshold:
+            return None
+
+        self._touch(slot)
+        return self._results[slot]
+
+    def put(self, query_vector: List[float], results: List[Dict[str, Any]]):
+        """
+        Store search results for a query vector
+
+        Args:
+            query_vector: Query embedding
+            results: Search results for that query
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return
+
+        # Reuse an expired or empty slot first, otherwise evict the LRU entry
+        now = time.monotonic()
+        free = np.flatnonzero(self._expires <= now)
+        slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+
+        self._vectors[slot] = vector
+        self._results[slot] = results
+        self._expires[slot] = now + self.ttl
+        self._touch(slot)
+
+
+# Singleton instance, sized for text-embedding-3-large
+query_vector_cache = QueryVectorCache(dimensions=3072)
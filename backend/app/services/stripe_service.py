@@ -4,6 +4,7 @@ Handles Success-Fee billing using Stripe Connect.
 """
 
 import os
+import asyncio
 import logging
 from typing import Dict, Optional, List
 from datetime import datetime
@@ -50,6 +51,9 @@ class StripeService:
     """
     Stripe service for handling Success-Fee payments.
     
+    The pinned stripe SDK is blocking, so API calls run in worker threads
+    to keep the event loop free.
+    
     Features:
     - Customer management
     - Payment intent creation for success fees
@@ -142,12 +146,13 @@ class StripeService:
         
         try:
             # Check for existing customer
-            existing = stripe.Customer.list(email=email, limit=1)
+            existing = await asyncio.to_thread(stripe.Customer.list, email=email, limit=1)
             if existing.data:
                 return existing.data[0].id
             
             # Create new customer
-            customer = stripe.Customer.create(
+            customer = await asyncio.to_thread(
+                stripe.Customer.create,
                 email=email,
                 name=company_name,
                 metadata={
@@ -200,7 +205,8 @@ class StripeService:
             }
         
         try:
-            payment_intent = stripe.PaymentIntent.create(
+            payment_intent = await asyncio.to_thread(
+                stripe.PaymentIntent.create,
                 amount=fee_amount_cents,
                 currency="eur",
                 customer=customer_id,
@@ -269,7 +275,8 @@ class StripeService:
         
         try:
             # Create invoice item
-            invoice_item = stripe.InvoiceItem.create(
+            invoice_item = await asyncio.to_thread(
+                stripe.InvoiceItem.create,
                 customer=customer_id,
                 amount=fee_amount_cents,
                 currency="eur",
@@ -281,7 +288,8 @@ class StripeService:
             )
             
             # Create invoice
-            invoice = stripe.Invoice.create(
+            invoice = await asyncio.to_thread(
+                stripe.Invoice.create,
                 customer=customer_id,
                 collection_method="send_invoice",
                 days_until_due=due_days,
@@ -294,7 +302,7 @@ class StripeService:
             )
             
             # Finalize invoice
-            invoice = stripe.Invoice.finalize_invoice(invoice.id)
+            invoice = await asyncio.to_thread(stripe.Invoice.finalize_invoice, invoice.id)
             
             logger.info(f"Created invoice: {invoice.id}")
             
@@ -327,7 +335,7 @@ class StripeService:
             return {"status": "mock", "id": payment_intent_id}
         
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment_intent = await asyncio.to_thread(stripe.PaymentIntent.retrieve, payment_intent_id)
             
             return {
                 "id": payment_intent.id,
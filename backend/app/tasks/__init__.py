@@ -1,2 +1,26 @@
 # Tasks Package
+import asyncio
+from typing import Any, Coroutine, TypeVar
 
+from app.services.application_writer import application_writer
+from app.services.openrouter_client import openrouter_client
+
+T = TypeVar("T")
+
+
+async def _close_loop_clients_after(coro: Coroutine[Any, Any, T]) -> T:
+    try:
+        return await coro
+    finally:
+        await application_writer.aclose()
+        await openrouter_client.aclose()
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    asyncio.run for Celery tasks
+    
+    Each call gets a fresh event loop, so the loop-bound HTTP and Redis
+    clients are closed before it ends instead of leaking with it.
+    """
+    return asyncio.run(_close_loop_clients_after(coro))
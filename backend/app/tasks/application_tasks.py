@@ -2,29 +2,30 @@
 Background tasks for grant application generation
 """
 from typing import Dict, Any, Optional
-import asyncio
-from datetime import datetime
 from sqlalchemy.orm import Session
 import os
 
 from app.celery_app import celery_app
-from app.services.application_writer import application_writer
+from app.services.application_writer import SECTION_TYPES, application_writer, build_generation_inputs
 from app.models.application import Application, ApplicationStatus
 from app.models.document import Document, DocumentFormat, DocumentType
 from app.core.database import AsyncSessionLocal
 from app.services.document_generator import document_generator
+from app.tasks import run_async
 
 
 @celery_app.task(name="generate_application_content", bind=True)
 def generate_application_content(
     self,
     application_id: str,
-    section: Optional[str] = None
+    section: Optional[str] = None,
+    refresh: bool = False
 ):
     """
     Background task to generate complete application content
     
     This task generates all sections of a grant application and saves to DB.
+    With refresh set (regeneration), cached completions are not reused.
     """
     try:
         # Create sync session for celery task
@@ -51,112 +52,31 @@ def generate_application_content(
             db.commit()
             
             # Prepare data for AI generation
-            project_info = {
-                "title": application.project_title,
-                "description": application.project_description,
-                "goals": application.project_goals or [],
-                "innovation": application.project_innovation or "",
-                "timeline_months": application.timeline_months,
-                "total_budget": application.total_budget,
-                "requested_funding": application.requested_funding,
-                "target_audience": application.target_audience or "",
-                "market_analysis": application.market_analysis or ""
-            }
+            project_info, budget_info = build_generation_inputs(application)
             
             grant_guidelines = ""  # TODO: Fetch from grant data
             
-            # Generate sections
-            sections = {}
-            total_sections = 7
-            
-            # 1. Project Description
-            print(f"[{application_id}] Generating project description...")
-            sections["project_description"] = asyncio.run(
-                application_writer.generate_project_description(
-                    project_info,
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 14
-            db.commit()
-            
-            # 2. Market Analysis
-            print(f"[{application_id}] Generating market analysis...")
-            sections["market_analysis"] = asyncio.run(
-                application_writer.generate_market_analysis(
-                    project_info,
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 28
-            db.commit()
-            
-            # 3. Technical Feasibility
-            print(f"[{application_id}] Generating technical feasibility...")
-            sections["technical_feasibility"] = asyncio.run(
-                application_writer.generate_technical_feasibility(
-                    project_info,
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 42
-            db.commit()
+            def record_progress(section_type: str, sections_done: int):
+                application.completion_percentage = sections_done * 100 // len(SECTION_TYPES)
+                db.commit()
+                print(f"[{application_id}] Generated {section_type}")
             
-            # 4. Work Plan
-            print(f"[{application_id}] Generating work plan...")
-            sections["work_plan"] = asyncio.run(
-                application_writer.generate_work_plan(
+            # Generate all sections concurrently, committing progress as each finishes
+            print(f"[{application_id}] Generating application sections...")
+            sections = run_async(
+                application_writer.generate_full_application(
                     project_info,
-                    project_info["timeline_months"],
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 57
-            db.commit()
-            
-            # 5. Financial Plan
-            print(f"[{application_id}] Generating financial plan...")
-            budget_info = {
-                "total_budget": application.total_budget,
-                "requested_funding": application.requested_funding,
-                "own_contribution": application.own_contribution,
-                "breakdown": application.budget_breakdown or {}
-            }
-            sections["financial_plan"] = asyncio.run(
-                application_writer.generate_financial_plan(
                     budget_info,
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 71
-            db.commit()
-            
-            # 6. Risk Management
-            print(f"[{application_id}] Generating risk management...")
-            sections["risk_management"] = asyncio.run(
-                application_writer.generate_risk_management(
-                    project_info,
-                    grant_guidelines
-                )
-            )
-            application.completion_percentage = 85
-            db.commit()
-            
-            # 7. Utilization Plan
-            print(f"[{application_id}] Generating utilization plan...")
-            sections["utilization_plan"] = asyncio.run(
-                application_writer.generate_utilization_plan(
-                    project_info,
-                    grant_guidelines
+                    project_info["timeline_months"],
+                    grant_guidelines,
+                    use_cache=not refresh,
+                    on_section_done=record_progress
                 )
             )
-            application.completion_percentage = 100
-            db.commit()
             
             # Save generated content to database
             application.generated_content = sections
             application.status = ApplicationStatus.READY
-            application.updated_at = datetime.utcnow()
             
             db.commit()
             
@@ -2,11 +2,12 @@
 Background tasks for grant data management
 """
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from app.celery_app import celery_app
-from app.services.embeddings import embedding_service
+from app.services.embeddings import EMBEDDING_BATCH_SIZE, embedding_service
 from app.services.qdrant_service import qdrant_service
+from app.tasks import run_async
 
 
 @celery_app.task(name="embed_grants")
@@ -24,16 +25,27 @@ def embed_grants(grants_data: List[Dict[str, Any]]):
         embedded_count = 0
         failed_count = 0
         
+        # Build texts per grant so one malformed grant doesn't fail the batch
+        embeddable_grants = []
+        texts = []
         for grant in grants_data:
             try:
-                # Build text for embedding
-                embedding_text = _build_embedding_text(grant)
-                
-                # Generate embedding
-                vector = asyncio.run(
-                    embedding_service.embed_text(embedding_text)
-                )
-                
+                texts.append(_build_embedding_text(grant))
+            except Exception as e:
+                print(f"Error building embedding text for grant {grant.get('id', 'unknown')}: {e}")
+                failed_count += 1
+                continue
+            embeddable_grants.append(grant)
+        
+        # Generate embeddings in batched requests
+        vectors = run_async(_embed_texts_with_fallback(texts))
+        
+        for grant, vector in zip(embeddable_grants, vectors):
+            if vector is None:
+                failed_count += 1
+                continue
+            
+            try:
                 # Prepare payload
                 payload = {
                     "external_id": grant["id"],
@@ -72,6 +84,30 @@ def embed_grants(grants_data: List[Dict[str, Any]]):
         raise
 
 
+async def _embed_texts_with_fallback(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed texts batch by batch
+    
+    A failed batch is retried one text at a time, so a single bad input
+    only loses its own grant; texts that still fail get None.
+    """
+    vectors: List[Optional[List[float]]] = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+        try:
+            vectors.extend(await embedding_service.embed_texts(batch))
+            continue
+        except Exception as e:
+            print(f"Batch embedding failed, embedding {len(batch)} texts one by one: {e}")
+        
+        results = await asyncio.gather(
+            *(embedding_service.embed_text(text) for text in batch),
+            return_exceptions=True
+        )
+        vectors.extend(None if isinstance(result, BaseException) else result for result in results)
+    return vectors
+
+
 def _build_embedding_text(grant: Dict[str, Any]) -> str:
     """Build comprehensive text for embedding"""
     parts = [
@@ -53,25 +53,29 @@ def run_scraper(self, scraper_name: str, save_to_file: bool = True) -> Dict:
         
         # Initialize scraper and change detection
         scraper = scraper_class()
-        change_service = ChangeDetectionService()
+        # Page state is kept next to the scraped data so changes are
+        # detected across runs
+        change_service = ChangeDetectionService(
+            store_path=os.path.join(DATA_DIR, "change_detection.sqlite3")
+        )
         
         # Run scraper
         save_path = os.path.join(DATA_DIR, f"{scraper_name}.json") if save_to_file else None
         programs = scraper.run(save_path=save_path)
         
-        # Detect changes
-        changes = []
+        # Detect changes, using the program's URL as key
+        items = []
         for program in programs:
-            # Check for changes using the program's URL as key
             url = program.get('url_offiziell') or program.get('source_url', '')
             if url:
-                change = change_service.detect_change(
-                    source_url=url,
-                    new_content=json.dumps(program),
-                    program_data=program
-                )
-                if change and change.change_type != ChangeType.NO_CHANGE:
-                    changes.append(change_service.to_dict(change))
+                items.append((url, json.dumps(program), program))
+        
+        changes = [
+            change_service.to_dict(change)
+            for change in change_service.detect_changes_batch(items)
+            if change and change.change_type != ChangeType.NO_CHANGE
+        ]
+        change_service.close()
         
         result = {
             "scraper": scraper_name,
@@ -0,0 +1,22 @@
+#!/bin/bash
+
+# Migration SQL Export Script
+# Renders Alembic migrations as a plain SQL script (offline mode) so they can
+# be applied with psql on hosts that cannot run the backend:
+#
+#   ./scripts/emit_migration_sql.sh [revision-range] [output-file]
+#   psql -1 -f migration.sql "$DATABASE_URL"
+
+set -e
+
+RANGE="${1:-head}"
+OUTPUT="${2:-migration.sql}"
+
+# Run from the backend directory so alembic.ini is picked up
+cd "$(dirname "$0")/.."
+
+echo "📝 Generating SQL for revision range: $RANGE"
+
+alembic upgrade "$RANGE" --sql > "$OUTPUT"
+
+echo "✅ Migration SQL written to: $OUTPUT"
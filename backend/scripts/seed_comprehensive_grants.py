@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 # Add app to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.services.deadlines import grant_deadline_ordinal
+
 # Try to import dependencies
 try:
     from openai import OpenAI
@@ -28,7 +30,8 @@ except ImportError:
 
 try:
     from qdrant_client import QdrantClient
-    from qdrant_client.models import Distance, VectorParams, PointStruct
+    from qdrant_client.models import PointStruct
+    from app.services.qdrant_schema import create_grants_collection
     QDRANT_AVAILABLE = True
 except ImportError:
     QDRANT_AVAILABLE = False
@@ -41,7 +44,6 @@ QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 COLLECTION_NAME = "grants"
 EMBEDDING_MODEL = "text-embedding-3-large"
-EMBEDDING_DIM = 3072
 
 
 def load_grant_files() -> List[Dict]:
@@ -258,10 +260,8 @@ def setup_qdrant_collection(client: 'QdrantClient'):
         logger.info(f"Collection '{COLLECTION_NAME}' exists, recreating...")
         client.delete_collection(COLLECTION_NAME)
     
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE)
-    )
+    # Same quantization and payload indexes as QdrantService.ensure_collection
+    create_grants_collection(client, COLLECTION_NAME)
     logger.info(f"Created collection '{COLLECTION_NAME}'")
 
 
@@ -298,6 +298,8 @@ def upload_to_qdrant(grants: List[Dict], host: str = None, port: int = None):
     for i, grant in enumerate(grants_with_embeddings):
         # Create payload without embedding
         payload = {k: v for k, v in grant.items() if k != 'embedding'}
+        # Parsed once here, like QdrantService.upsert_grant, for the deadline filter
+        payload['deadline_ordinal'] = grant_deadline_ordinal(payload)
         
         point = PointStruct(
             id=i,
@@ -0,0 +1,28 @@
+"""
+Tests for Application Writer Service
+"""
+import pytest
+from app.services.application_writer import SECTION_TYPES, ApplicationWriter
+
+
+@pytest.mark.asyncio
+async def test_generate_full_application_reports_progress(monkeypatch):
+    """Test that progress is reported once per finished section"""
+    writer = ApplicationWriter()
+    
+    async def fake_generate_section(section_type, *args):
+        return f"text for {section_type}"
+    
+    monkeypatch.setattr(writer, "generate_section", fake_generate_section)
+    progress = []
+    
+    sections = await writer.generate_full_application(
+        {"title": "Projekt"},
+        {},
+        12,
+        "",
+        on_section_done=lambda section_type, done: progress.append(done)
+    )
+    
+    assert tuple(sections) == SECTION_TYPES
+    assert progress == list(range(1, len(SECTION_TYPES) + 1))
@@ -0,0 +1,30 @@
+"""
+Tests for Applications API helpers
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.applications import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the keyset position it was built from"""
+    application = SimpleNamespace(
+        created_at=datetime(2025, 6, 30, 12, 0, 0, 123456, tzinfo=timezone.utc),
+        id=uuid4()
+    )
+    
+    assert decode_cursor(encode_cursor(application)) == (application.created_at, application.id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "aGVsbG8=", "MjAyNS0wNi0zMHxub3QtYS11dWlk", "_w=="])
+def test_decode_cursor_rejects_bad_cursors(cursor):
+    """Test that malformed cursors are a 400, not a server error"""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    
+    assert exc_info.value.status_code == 400
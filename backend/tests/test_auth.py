@@ -0,0 +1,51 @@
+"""
+Tests for authentication helpers
+"""
+from uuid import uuid4
+
+import pytest
+
+from app.api.v1 import auth
+
+
+def test_password_reset_token_round_trip():
+    """Test that a fresh reset token yields its user and matches the password"""
+    user_id = uuid4()
+    token = auth.create_password_reset_token(user_id, "$argon2id$hash-a")
+
+    token_data = auth.read_password_reset_token(token)
+
+    assert token_data is not None
+    assert token_data[0] == user_id
+    assert auth.password_reset_token_matches(token_data[1], "$argon2id$hash-a")
+
+
+def test_password_reset_token_replay():
+    """Test that a reset token stops matching once the password has changed"""
+    token = auth.create_password_reset_token(uuid4(), "$argon2id$hash-a")
+    _, fingerprint = auth.read_password_reset_token(token)
+
+    assert not auth.password_reset_token_matches(fingerprint, "$argon2id$hash-b")
+
+
+def test_password_reset_token_expiry(monkeypatch):
+    """Test that expired or tampered reset tokens are rejected"""
+    token = auth.create_password_reset_token(uuid4(), "$argon2id$hash-a")
+
+    assert auth.read_password_reset_token(token + "x") is None
+
+    monkeypatch.setattr(auth, "_RESET_TOKEN_MAX_AGE", -1)
+    assert auth.read_password_reset_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_is_token_revoked_fails_open_when_redis_is_down(monkeypatch):
+    """Test that a Redis outage neither raises nor caches the negative answer"""
+    async def unavailable(*args):
+        raise auth.RedisError("connection refused")
+
+    monkeypatch.setattr(auth.redis_client, "exists", unavailable)
+    jti = uuid4().hex
+
+    assert await auth.is_token_revoked({"jti": jti}) is False
+    assert jti not in auth._unrevoked_token_ids
@@ -0,0 +1,35 @@
+"""
+Tests for Change Detection Service
+"""
+import numpy as np
+
+from app.services.change_detection import DIFF_CONTEXT_CHARS, changed_window, word_minhash
+
+
+def test_changed_window_keeps_context_after_the_change():
+    """Test that a changed date is shown whole, not cut after the differing digit"""
+    old, new = changed_window("Antragsfrist: 01.01.2025", "Antragsfrist: 02.01.2025")
+    
+    assert old == "Antragsfrist: 01.01.2025"
+    assert new == "Antragsfrist: 02.01.2025"
+
+
+def test_changed_window_bounds_context():
+    """Test that unchanged text beyond the context on either side is dropped"""
+    padding = "x" * (DIFF_CONTEXT_CHARS * 2)
+    old, new = changed_window(padding + "alt" + padding, padding + "neu" + padding)
+    
+    assert old == "x" * DIFF_CONTEXT_CHARS + "alt" + "x" * DIFF_CONTEXT_CHARS
+    assert new == "x" * DIFF_CONTEXT_CHARS + "neu" + "x" * DIFF_CONTEXT_CHARS
+
+
+def test_word_minhash_estimates_jaccard_similarity():
+    """Test that signature agreement tracks the word-set Jaccard similarity"""
+    old_words = [f"wort{i}" for i in range(100)]
+    new_words = [f"wort{i}" for i in range(20, 120)]  # Jaccard 80/120
+    
+    similarity = float(np.mean(word_minhash(" ".join(old_words)) == word_minhash(" ".join(new_words))))
+    
+    assert abs(similarity - 80 / 120) < 0.1
+    assert float(np.mean(word_minhash("a b c") == word_minhash("c b a a"))) == 1.0
+    assert word_minhash("   ") is None
@@ -0,0 +1,28 @@
+"""
+Tests for deadline parsing
+"""
+from datetime import date
+
+import pytest
+
+from app.services.deadlines import parse_deadline_ordinal
+
+
+@pytest.mark.parametrize("deadline, expected", [
+    ("2025-06-30", date(2025, 6, 30)),
+    ("2025-06-30T23:59:59Z", date(2025, 6, 30)),
+    ("30.06.2025", date(2025, 6, 30)),
+    ("Einreichung bis 1.7.2025", date(2025, 7, 1)),
+    ("30.06.25", date(2025, 6, 30)),
+    ("06/2025", date(2025, 6, 28)),
+    ("2026", date(2026, 12, 31)),
+])
+def test_parse_deadline_ordinal_formats(deadline, expected):
+    """Test each supported deadline format"""
+    assert parse_deadline_ordinal(deadline) == expected.toordinal()
+
+
+@pytest.mark.parametrize("deadline", ["Laufend", " fortlaufend ", "", "31.02.2025", "nach Vereinbarung"])
+def test_parse_deadline_ordinal_without_date(deadline):
+    """Test that continuous, invalid and free-text deadlines yield None"""
+    assert parse_deadline_ordinal(deadline) is None
@@ -0,0 +1,42 @@
+"""
+Tests for Grants API helpers
+"""
+from starlette.requests import Request
+
+from app.api.v1.grants import _etag_response
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_response_returns_body_with_etag():
+    """Test that a first request gets the body and an ETag"""
+    response = _etag_response(_request(), b'{"id": "1"}')
+    
+    assert response.status_code == 200
+    assert response.body == b'{"id": "1"}'
+    assert response.headers["etag"].startswith('"')
+
+
+def test_etag_response_not_modified():
+    """Test that a matching If-None-Match gets an empty 304"""
+    body = b'{"id": "1"}'
+    etag = _etag_response(_request(), body).headers["etag"]
+    
+    response = _etag_response(_request(f'"other", {etag}'), body)
+    
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+
+
+def test_etag_response_changed_body():
+    """Test that a stale ETag gets the new body"""
+    etag = _etag_response(_request(), b'{"id": "1"}').headers["etag"]
+    
+    response = _etag_response(_request(etag), b'{"id": "2"}')
+    
+    assert response.status_code == 200
+    assert response.body == b'{"id": "2"}'
@@ -0,0 +1,98 @@
+"""
+Tests for Qdrant Service lookups and collection setup
+"""
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from app.api.v1.grants import GrantBatchRequest, get_grant_details_batch
+from app.services.qdrant_schema import PAYLOAD_INDEXES, QUANTIZATION_CONFIG, ensure_grants_collection
+from app.services.qdrant_service import qdrant_service
+
+URL = "https://www.foerderdatenbank.de/programm-a.html"
+
+
+@pytest_asyncio.fixture
+async def grants_collection(monkeypatch):
+    """In-memory collection holding points keyed like the importers do"""
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        collection_name=qdrant_service.collection_name,
+        vectors_config=VectorParams(size=2, distance=Distance.COSINE)
+    )
+    await client.upsert(
+        collection_name=qdrant_service.collection_name,
+        points=[
+            # import_foerderdatenbank.py: point id from "foerderdatenbank_<n>"
+            PointStruct(id=qdrant_service.point_id("foerderdatenbank_0"), vector=[1.0, 0.0],
+                        payload={"title": "Programm A", "url": URL}),
+            # embed_grants: point id from the external id
+            PointStruct(id=qdrant_service.point_id("ext-1"), vector=[0.0, 1.0],
+                        payload={"name": "Programm B", "external_id": "ext-1"}),
+            # seed_comprehensive_grants.py: integer point ids, no URL field
+            PointStruct(id=7, vector=[1.0, 1.0], payload={"name": "Programm C"}),
+        ]
+    )
+    monkeypatch.setattr(qdrant_service, "async_client", client)
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_retrieve_grants_by_url_when_point_id_differs(grants_collection):
+    """Test that a grant keyed by an importer id is found by its URL"""
+    results = await qdrant_service.retrieve_grants_async([URL, "ext-1", "7", "unknown"])
+    
+    found = {result["grant_id"]: result["payload"] for result in results}
+    assert set(found) == {URL, "ext-1", "7"}
+    assert found[URL]["title"] == "Programm A"
+    assert found["7"]["name"] == "Programm C"
+
+
+@pytest.mark.asyncio
+async def test_grant_batch_returns_search_ids(grants_collection):
+    """Test that /batch resolves the ids /search hands out, in request order"""
+    grants = await get_grant_details_batch(GrantBatchRequest(ids=["ext-1", URL, URL]))
+    
+    assert [grant["id"] for grant in grants] == ["ext-1", URL]
+    assert grants[1]["name"] == "Programm A"
+
+
+class _RecordingClient:
+    """Stands in for QdrantClient, recording collection updates"""
+    
+    def __init__(self, quantization_config):
+        self.info = SimpleNamespace(config=SimpleNamespace(quantization_config=quantization_config))
+        self.calls = []
+    
+    def get_collections(self):
+        return SimpleNamespace(collections=[SimpleNamespace(name="grants")])
+    
+    def get_collection(self, collection_name):
+        return self.info
+    
+    def update_collection(self, **kwargs):
+        self.calls.append(("update_collection", kwargs))
+    
+    def create_payload_index(self, **kwargs):
+        self.calls.append(("create_payload_index", kwargs["field_name"]))
+
+
+def test_ensure_grants_collection_quantizes_existing_collection():
+    """Test that a collection created without quantization gets it added in place"""
+    client = _RecordingClient(quantization_config=None)
+    
+    assert ensure_grants_collection(client, "grants") == "quantized"
+    assert client.calls[0] == ("update_collection", {"collection_name": "grants", "quantization_config": QUANTIZATION_CONFIG})
+    assert [call[1] for call in client.calls[1:]] == [field_name for field_name, _ in PAYLOAD_INDEXES]
+
+
+def test_ensure_grants_collection_keeps_quantized_collection():
+    """Test that an already quantized collection only gets its payload indexes"""
+    client = _RecordingClient(quantization_config=QUANTIZATION_CONFIG)
+    
+    assert ensure_grants_collection(client, "grants") == "unchanged"
+    assert all(call[0] == "create_payload_index" for call in client.calls)
@@ -18,6 +18,9 @@ export interface ApplicationCreate {
 export interface Application {
   id: string;
   grant_external_id: string;
+  grant_name?: string;
+  grant_type?: string;
+  grant_max_funding?: number;
   project_title: string;
   project_description: string;
   status: string;
@@ -46,7 +49,7 @@ export const applicationsApi = {
 
   list: async (params?: {
     status?: string;
-    skip?: number;
+    cursor?: string;
     limit?: number;
   }): Promise<Application[]> => {
     const { data } = await apiClient.get('/api/v1/applications', { params });
@@ -63,6 +63,13 @@ docker compose -f "${COMPOSE_FILE}" build --no-cache
 echo -e "\n${YELLOW}🗃️ Running database migrations...${NC}"
 docker compose -f "${COMPOSE_FILE}" run --rm api alembic upgrade head
 
+# =============================================================================
+# Update the Qdrant grants collection (quantization, payload indexes)
+# =============================================================================
+echo -e "\n${YELLOW}🧭 Updating Qdrant collection...${NC}"
+docker compose -f "${COMPOSE_FILE}" run --rm api python -c \
+    "from app.services.qdrant_service import qdrant_service; qdrant_service.ensure_collection()"
+
 # =============================================================================
 # Stop old containers
 # =============================================================================